@@ -0,0 +1,33 @@
+from django_filters import rest_framework as filters
+from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange
+
+
+class GitHubEventFilter(filters.FilterSet):
+    start_date = filters.DateFilter(field_name='date', lookup_expr='gte')
+    end_date = filters.DateFilter(field_name='date', lookup_expr='lte')
+    repo = filters.CharFilter(field_name='repo')
+
+    class Meta:
+        model = GitHubEvent
+        fields = ['start_date', 'end_date', 'repo', 'event_type']
+
+
+class GitHubCommitFilter(filters.FilterSet):
+    start_date = filters.DateFilter(field_name='date', lookup_expr='gte')
+    end_date = filters.DateFilter(field_name='date', lookup_expr='lte')
+    repo = filters.CharFilter(field_name='repo')
+
+    class Meta:
+        model = GitHubCommit
+        fields = ['start_date', 'end_date', 'repo']
+
+
+class GithubFileChangeFilter(filters.FilterSet):
+    start_date = filters.DateFilter(field_name='github_commit__date', lookup_expr='gte')
+    end_date = filters.DateFilter(field_name='github_commit__date', lookup_expr='lte')
+    repo = filters.CharFilter(field_name='github_commit__repo')
+    commit = filters.CharFilter(field_name='github_commit_id')
+
+    class Meta:
+        model = GithubFileChange
+        fields = ['start_date', 'end_date', 'repo', 'commit']
@@ -0,0 +1,71 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.utils.calendar_matrix import activity_streaks, calendar_matrix, daily_goal_progress
+from core.utils.github import calculate_activity_streak, calculate_daily_goal_progress
+
+
+def synthetic_calendar(year, today, rng):
+    """A `contributionCalendar` object with random counts up to today, laid out in weeks."""
+    days = []
+    day = date(year, 1, 1)
+    while day.year == year:
+        count = rng.choice((0, 0, 1, 2, 3, 5, 8)) if day <= today else 0
+        days.append({"date": day.isoformat(), "contributionCount": count})
+        day += timedelta(days=1)
+    weeks = [{"contributionDays": days[offset:offset + 7]} for offset in range(0, len(days), 7)]
+    return {"totalContributions": sum(day["contributionCount"] for day in days), "weeks": weeks}
+
+
+class Command(BaseCommand):
+    help = "Benchmark the vectorized calendar streak and goal engine against the per-calendar functions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--daily-goal", type=int, default=2)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        today = date.today()
+        daily_goal = options["daily_goal"]
+        day_index = (today - date(today.year, 1, 1)).days
+        calendars = [synthetic_calendar(today.year, today, rng) for _ in range(options["users"])]
+
+        started = time.perf_counter()
+        expected = [
+            (
+                calculate_activity_streak(calendar, daily_goal, day_index + 1),
+                calculate_daily_goal_progress(calendar, daily_goal),
+            )
+            for calendar in calendars
+        ]
+        loop_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matrix = calendar_matrix(calendars, today.year)
+        build_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        current, longest = activity_streaks(matrix, daily_goal, days=day_index)
+        contributions, progress = daily_goal_progress(matrix, daily_goal, day_index)
+        vector_seconds = time.perf_counter() - started
+
+        mismatches = sum(
+            1
+            for row, (streak, goal) in enumerate(expected)
+            if (streak["current_streak"], streak["longest_streak"], goal["today"], goal["progress"])
+            != (current[row], longest[row], contributions[row], progress[row])
+        )
+
+        self.stdout.write(f"{len(calendars)} calendars, daily goal {daily_goal}")
+        self.stdout.write(f"  per-calendar functions: {loop_seconds * 1000:.1f} ms")
+        self.stdout.write(f"  matrix build:           {build_seconds * 1000:.1f} ms")
+        self.stdout.write(f"  vectorized engine:      {vector_seconds * 1000:.1f} ms")
+        if mismatches:
+            self.stderr.write(self.style.ERROR(f"{mismatches} calendars differ from the per-calendar functions"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Results match the per-calendar functions"))
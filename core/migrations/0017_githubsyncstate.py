@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0016_alter_userchallenge_start_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GitHubSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('repo', models.TextField(blank=True, default='')),
+                ('synced_from', models.DateField(null=True)),
+                ('synced_until', models.DateTimeField(null=True)),
+                ('last_commit_at', models.DateTimeField(null=True)),
+                ('cursor', models.CharField(blank=True, default='', max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='github_sync_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'repo')},
+            },
+        ),
+    ]
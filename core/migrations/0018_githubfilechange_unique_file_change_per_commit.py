@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:15
+
+from django.db import migrations, models
+
+
+def delete_duplicate_file_changes(apps, schema_editor):
+    """Keep the oldest row of every (github_commit, filename) pair before adding the constraint."""
+    GithubFileChange = apps.get_model('core', 'GithubFileChange')
+    duplicates = (
+        GithubFileChange.objects.values('github_commit', 'filename')
+        .annotate(keep_id=models.Min('id'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        GithubFileChange.objects.filter(
+            github_commit=duplicate['github_commit'], filename=duplicate['filename']
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_githubsyncstate'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_file_changes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='githubfilechange',
+            constraint=models.UniqueConstraint(fields=('github_commit', 'filename'), name='unique_file_change_per_commit'),
+        ),
+    ]
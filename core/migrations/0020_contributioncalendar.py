@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0019_githubsyncjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContributionCalendar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('calendar', models.JSONField(default=dict)),
+                ('fetched_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contribution_calendars', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'year')},
+            },
+        ),
+    ]
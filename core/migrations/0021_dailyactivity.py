@@ -0,0 +1,61 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_daily_activity(apps, schema_editor):
+    """Roll up the commits stored so far."""
+    GitHubCommit = apps.get_model('core', 'GitHubCommit')
+    DailyActivity = apps.get_model('core', 'DailyActivity')
+    totals = (
+        GitHubCommit.objects.filter(date__isnull=False)
+        .values('github_event__user', 'date')
+        .annotate(
+            total_commits=models.Count('oid'),
+            total_additions=models.Sum('additions'),
+            total_deletions=models.Sum('deletions'),
+        )
+        .order_by()
+    )
+    DailyActivity.objects.bulk_create(
+        (
+            DailyActivity(
+                user_id=total['github_event__user'],
+                date=total['date'],
+                commits=total['total_commits'],
+                additions=total['total_additions'],
+                deletions=total['total_deletions'],
+                changes=total['total_additions'] + total['total_deletions'],
+            )
+            for total in totals.iterator()
+        ),
+        batch_size=1000,
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0020_contributioncalendar'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('commits', models.PositiveIntegerField(default=0)),
+                ('additions', models.PositiveIntegerField(default=0)),
+                ('deletions', models.PositiveIntegerField(default=0)),
+                ('changes', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activities', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(build_daily_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_dailyactivity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userchallenge',
+            name='accumulated_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userchallenge',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userchallenge',
+            name='last_processed_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userchallenge',
+            name='progress_rules',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
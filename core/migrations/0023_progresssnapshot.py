@@ -0,0 +1,52 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_progress_detail(apps, schema_editor):
+    """Move accumulate progress history into snapshots, keeping the last entry of each day."""
+    UserChallenge = apps.get_model('core', 'UserChallenge')
+    ProgressSnapshot = apps.get_model('core', 'ProgressSnapshot')
+    snapshots = []
+    user_challenges = UserChallenge.objects.filter(challenge__commitment_by='accumulate')
+    for user_challenge_id, progress_detail in user_challenges.values_list('id', 'progress_detail').iterator():
+        if not isinstance(progress_detail, list):
+            continue
+        by_date = {
+            entry['date'][:10]: entry['progress']
+            for entry in progress_detail
+            if isinstance(entry, dict) and 'date' in entry and 'progress' in entry
+        }
+        snapshots.extend(
+            ProgressSnapshot(user_challenge_id=user_challenge_id, date=date, progress=min(100, int(progress)))
+            for date, progress in by_date.items()
+        )
+    ProgressSnapshot.objects.bulk_create(snapshots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_userchallenge_progress_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgressSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('user_challenge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_snapshots', to='core.userchallenge')),
+            ],
+            options={
+                'unique_together': {('user_challenge', 'date')},
+            },
+        ),
+        migrations.RunPython(copy_progress_detail, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='userchallenge',
+            name='progress_detail',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+def rebuild_progress_state(apps, schema_editor):
+    """Existing running state has no bitmap yet, have the next update rebuild it."""
+    UserChallenge = apps.get_model('core', 'UserChallenge')
+    UserChallenge.objects.update(last_processed_date=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_progresssnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userchallenge',
+            name='goal_bitmap',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.RunPython(rebuild_progress_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:10
+
+from django.db import migrations
+
+
+def rebuild_progress_state(apps, schema_editor):
+    """`accumulated_total` now covers the whole challenge window, have the next update rebuild it."""
+    UserChallenge = apps.get_model('core', 'UserChallenge')
+    UserChallenge.objects.update(last_processed_date=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_userchallenge_goal_bitmap'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_progress_state, migrations.RunPython.noop),
+    ]
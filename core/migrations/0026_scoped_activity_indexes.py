@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_userchallenge_window_total'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='githubevent',
+            index=models.Index(fields=['user', 'date', 'id'], name='core_github_user_id_007306_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='githubfilechange',
+            index=models.Index(fields=['github_commit', 'id'], name='core_github_github__a49c08_idx'),
+        ),
+    ]
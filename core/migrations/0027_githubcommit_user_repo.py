@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0026_scoped_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='githubcommit',
+            name='repo',
+            field=models.TextField(default=''),
+        ),
+        migrations.AddField(
+            model_name='githubcommit',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='github_commits', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
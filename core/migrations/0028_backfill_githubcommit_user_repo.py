@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+def copy_event_columns(apps, schema_editor):
+    """Fills the user and repo of every commit from its event, in one UPDATE."""
+    GitHubCommit = apps.get_model('core', 'GitHubCommit')
+    GitHubEvent = apps.get_model('core', 'GitHubEvent')
+    event = GitHubEvent.objects.filter(pk=models.OuterRef('github_event_id'))
+    GitHubCommit.objects.update(
+        user_id=models.Subquery(event.values('user_id')[:1]),
+        repo=models.Subquery(event.values('repo')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+    # Kept apart from the schema changes: on PostgreSQL the deferred FK checks queued by the
+    # UPDATE would make an ALTER TABLE of `core_githubcommit` in the same transaction fail
+
+    dependencies = [
+        ('core', '0027_githubcommit_user_repo'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_event_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0028_backfill_githubcommit_user_repo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='githubcommit',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='github_commits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='githubcommit',
+            index=models.Index(fields=['user', 'date', 'oid'], name='core_github_user_id_f95d21_idx'),
+        ),
+    ]
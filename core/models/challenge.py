@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
 from django.db import models
+import hashlib
 import uuid
 from django.conf import settings
 from storages.backends.s3boto3 import S3Boto3Storage
@@ -58,12 +59,21 @@ class Challenge(ResourceMixin, models.Model):
         related_name='challenges'
     )
 
+    # Fields that user progress depends on
+    PROGRESS_RULE_FIELDS = ['type', 'commitment_by', 'target_value', 'frequency', 'start_date', 'end_date']
+
     class Meta:
         ordering = ['name'] 
 
     def __str__(self):
         return f"{self.name}"
 
+    @property
+    def rules_digest(self):
+        """Digest of the fields progress is computed from, changes when the rules are edited."""
+        rules = [getattr(self, field) for field in self.PROGRESS_RULE_FIELDS]
+        return hashlib.md5(str(rules).encode()).hexdigest()
+
     def get_presigned_urls(self):
         """Generate presigned URLs with 1 hour expiration"""
         urls = {}
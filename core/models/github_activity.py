@@ -1,5 +1,9 @@
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils.dateparse import parse_datetime
 
 class GitHubEvent(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -7,11 +11,19 @@ class GitHubEvent(models.Model):
     event_type = models.CharField(max_length=50)
     repo = models.TextField()  # Changed to TextField for flexibility
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id']),  # A user's events by date
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.date} - {self.event_type}"
 
 class GitHubCommit(models.Model):
     github_event = models.ForeignKey(GitHubEvent, on_delete=models.CASCADE)
+    # Copied from `github_event` so that a user's commits are read without joining the events
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='github_commits')
+    repo = models.TextField(default='')
     oid = models.CharField(unique=True, db_index=True, primary_key=True, max_length=100)
     author = models.JSONField(default=dict)
     committer = models.JSONField(default=dict)
@@ -22,6 +34,11 @@ class GitHubCommit(models.Model):
     message = models.TextField()  # Changed to TextField for long commit messages
     url = models.TextField()  # Changed to TextField for longer URLs
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'oid']),  # A user's commits by date, in list order
+        ]
+
 class GithubFileChange(models.Model):
     github_commit = models.ForeignKey(GitHubCommit, on_delete=models.CASCADE)
     sha = models.CharField(db_index=True, max_length=100)
@@ -33,3 +50,221 @@ class GithubFileChange(models.Model):
     blob_url = models.TextField()  # Changed to TextField for longer URLs
     raw_url = models.TextField()  # Changed to TextField for longer URLs
     contents_url = models.TextField()  # Changed to TextField for longer URLs
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['github_commit', 'filename'], name='unique_file_change_per_commit'),
+        ]
+        indexes = [
+            models.Index(fields=['github_commit', 'id']),  # File changes of a commit in list order
+        ]
+
+class GitHubSyncState(models.Model):
+    """
+    High-water marks of what has already been synced from GitHub for a user.
+
+    The row with an empty `repo` covers the user as a whole: every commit committed between
+    `synced_from` and `synced_until` is stored, and `cursor` holds the id of the newest event
+    read from the events feed. Per-repository rows hold the newest synced commit in `cursor`
+    and its timestamp in `last_commit_at`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='github_sync_states')
+    repo = models.TextField(blank=True, default='')
+    synced_from = models.DateField(null=True)
+    synced_until = models.DateTimeField(null=True)
+    last_commit_at = models.DateTimeField(null=True)
+    cursor = models.CharField(max_length=255, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'repo']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.repo or '*'} - {self.synced_until}"
+
+    def delta_since(self, start_date):
+        """
+        Returns the timestamp from which commits have to be requested again for a window
+        starting at `start_date`, or None when the window is not covered by this mark.
+        """
+        if self.synced_from is None or self.synced_until is None or start_date < self.synced_from:
+            return None
+        window_start = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+        if window_start > self.synced_until:
+            return None
+        overlap = timedelta(minutes=settings.GITHUB_SYNC_OVERLAP_MINUTES)
+        return max(window_start, self.synced_until - overlap)
+
+    @classmethod
+    def record_sync(cls, user, synced_from, synced_until, commit_data):
+        """
+        Advances the user's marks after the commits in `commit_data` have been stored.
+        The covered range only grows when the synced window touches it, else it is replaced.
+        """
+        state, _ = cls.objects.get_or_create(user=user, repo='')
+        window_start = datetime.combine(synced_from, time.min, tzinfo=timezone.utc)
+        overlap = timedelta(minutes=settings.GITHUB_SYNC_OVERLAP_MINUTES)
+        touches = (
+            state.synced_from is not None
+            and state.synced_until is not None
+            and window_start <= state.synced_until - overlap
+            and synced_until >= datetime.combine(state.synced_from, time.min, tzinfo=timezone.utc)
+        )
+        if touches:
+            state.synced_from = min(state.synced_from, synced_from)
+            state.synced_until = max(state.synced_until, synced_until)
+        else:
+            # A gap between the windows was never synced, the mark only vouches for the new one
+            state.synced_from = synced_from
+            state.synced_until = synced_until
+        state.save()
+
+        heads = {}
+        for commits in commit_data.values():
+            for commit in commits:
+                repo = commit.get('repository')
+                committed_at = parse_datetime(commit.get('committed_date') or '')
+                if not repo or not committed_at:
+                    continue
+                if repo not in heads or committed_at > heads[repo][0]:
+                    heads[repo] = (committed_at, commit['oid'])
+
+        for repo, (committed_at, oid) in heads.items():
+            repo_state, created = cls.objects.get_or_create(
+                user=user,
+                repo=repo,
+                defaults={'last_commit_at': committed_at, 'cursor': oid},
+            )
+            if not created and (repo_state.last_commit_at is None or committed_at > repo_state.last_commit_at):
+                repo_state.last_commit_at = committed_at
+                repo_state.cursor = oid
+                repo_state.save()
+
+class GitHubSyncJob(models.Model):
+    """
+    A commits-with-changes crawl running in Celery. Live progress is kept in the cache under
+    `progress_key` while the job runs.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='github_sync_jobs')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    repositories_crawled = models.PositiveIntegerField(default=0)
+    commits_found = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.start_date} - {self.end_date} - {self.status}"
+
+    @property
+    def progress_key(self):
+        return f"github-sync-job:{self.id}:progress"
+
+
+class DailyActivity(models.Model):
+    """
+    Per-day rollup of a user's stored commits, kept in sync by `ingest_commits`.
+    `changes` counts additions plus deletions.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_activities')
+    date = models.DateField()
+    commits = models.PositiveIntegerField(default=0)
+    additions = models.PositiveIntegerField(default=0)
+    deletions = models.PositiveIntegerField(default=0)
+    changes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user', 'date']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date} - {self.commits}"
+
+    @classmethod
+    def rebuild(cls, user, dates):
+        """
+        Recomputes the user's rollup rows for `dates` from their commits, dropping the rows
+        of days left without any.
+
+        Returns:
+            dict: `(before, after)` pairs of `{"commits", "changes"}` values by date, for the
+            days whose totals changed.
+        """
+        dates = {date for date in dates if date is not None}
+        if not dates:
+            return {}
+
+        empty = {'commits': 0, 'changes': 0}
+        before = {
+            row['date']: {'commits': row['commits'], 'changes': row['changes']}
+            for row in cls.objects.filter(user=user, date__in=dates).values('date', 'commits', 'changes')
+        }
+
+        totals = (
+            GitHubCommit.objects.filter(user=user, date__in=dates)
+            .values('date')
+            .annotate(
+                total_commits=models.Count('oid'),
+                total_additions=models.Sum('additions'),
+                total_deletions=models.Sum('deletions'),
+            )
+        )
+        rows = [
+            cls(
+                user=user,
+                date=total['date'],
+                commits=total['total_commits'],
+                additions=total['total_additions'],
+                deletions=total['total_deletions'],
+                changes=total['total_additions'] + total['total_deletions'],
+            )
+            for total in totals
+        ]
+        cls.objects.filter(user=user, date__in=dates - {row.date for row in rows}).delete()
+        cls.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=['commits', 'additions', 'deletions', 'changes'],
+        )
+
+        after = {row.date: {'commits': row.commits, 'changes': row.changes} for row in rows}
+        return {
+            date: (before.get(date, empty), after.get(date, empty))
+            for date in dates
+            if before.get(date, empty) != after.get(date, empty)
+        }
+
+
+class ContributionCalendar(models.Model):
+    """
+    A user's GitHub contribution calendar for one year, as returned under
+    `contributionsCollection.contributionCalendar`.
+
+    Once a calendar has been fetched after its year ended it is final and never refetched.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='contribution_calendars')
+    year = models.PositiveSmallIntegerField()
+    calendar = models.JSONField(default=dict)
+    fetched_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['user', 'year']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.year}"
+
+    @property
+    def is_final(self):
+        # A day of slack lets pushes made around midnight of New Year's Eve land first
+        year_end = datetime(self.year + 1, 1, 2, tzinfo=timezone.utc)
+        return self.fetched_at >= year_end
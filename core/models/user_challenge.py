@@ -1,10 +1,14 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from core.models.challenge import Challenge
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.timezone import now
+from datetime import timedelta
+from django.conf import settings
 
-from core.models.github_activity import GitHubCommit
+from core.models.github_activity import DailyActivity
+from core.utils import goal_bitmap as bitmaps
+from core.utils import leaderboard
 
 class UserChallenge(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -15,7 +19,23 @@ class UserChallenge(models.Model):
         default=0,
         validators=[MinValueValidator(0), MaxValueValidator(100)]
     )
-    progress_detail = models.JSONField(default=dict)  # Added JSONField for detailed progress tracking
+
+    # Running state folded up to `last_processed_date`, the last finished day taken into account.
+    # `current_streak` is the streak of days meeting the daily goal ending that day.
+    # `accumulated_total` is the sum of the challenge metric (commits or changes) over all the
+    # activity stored for the challenge window, incremented atomically as commits are ingested.
+    # Bit `i` of `goal_bitmap` is set when the daily goal was met on day `i` of the challenge.
+    last_processed_date = models.DateField(null=True, blank=True)
+    current_streak = models.PositiveIntegerField(default=0)
+    accumulated_total = models.PositiveIntegerField(default=0)
+    progress_rules = models.CharField(max_length=32, blank=True, default='')
+    goal_bitmap = models.BinaryField(default=b'', blank=True)
+
+    # Fields written by a progress update
+    PROGRESS_FIELDS = [
+        'progress', 'highest_streak',
+        'last_processed_date', 'current_streak', 'accumulated_total', 'progress_rules', 'goal_bitmap',
+    ]
     
     class Meta:
         unique_together = ['user', 'challenge']
@@ -27,84 +47,290 @@ class UserChallenge(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.challenge.title} - {self.progress}%"
 
-    def update_progress(self):
+    def reset_progress(self):
+        """
+        Drops the running state so the next update rebuilds it from the challenge start.
+        """
+        self.last_processed_date = None
+        self.current_streak = 0
+        self.accumulated_total = 0
+        self.highest_streak = 0
+        self.goal_bitmap = b''
+
+    def window_total(self):
         """
-        Update progress based on challenge type and user activity
+        Sums the challenge metric over the user's stored activity in the challenge window.
         """
         challenge = self.challenge
-        user = self.user
-        today = now().date()
+        activity = DailyActivity.objects.filter(user_id=self.user_id, date__gte=challenge.start_date)
+        if challenge.end_date:
+            activity = activity.filter(date__lte=challenge.end_date)
+        metric = "commits" if challenge.type == "commits" else "changes"
+        return activity.aggregate(total=models.Sum(metric))["total"] or 0
 
-        if challenge.end_date and today > challenge.end_date:
-            return {
-                "message": "Challenge already finished",
-                "progress": self.progress,
-                "progress_detail": self.progress_detail,
-            }
+    def progress_window(self, today):
+        """
+        Returns the first and last day of activity the next update needs, resetting the running
+        state first when the challenge rules changed since it was built.
+        Must run with the row locked, see `update_progress`, so that a rebuilt total cannot
+        miss or double count a concurrent ingestion.
+        """
+        challenge = self.challenge
+        if self.progress_rules != challenge.rules_digest or self.last_processed_date is None:
+            self.reset_progress()
+            self.progress_rules = challenge.rules_digest
+            self.accumulated_total = self.window_total()
+            first_day = challenge.start_date
+        else:
+            first_day = self.last_processed_date + timedelta(days=1)
+        return first_day, min(today, challenge.end_date or today)
+
+    def apply_progress(self, activity, today, first_day, last_day):
+        """
+        Advances the running state over the finished days after `last_processed_date` and
+        derives the progress. Daily challenges count today on top without storing it, the
+        total of accumulate challenges already includes it.
+
+        Args:
+            activity (dict): `DailyActivity` values (`commits`, `changes`) by date, covering
+                at least `first_day` to `last_day`. Days without a row had no commits.
+            today (date): The current day.
+            first_day, last_day (date): The window returned by `progress_window`.
+        """
+        challenge = self.challenge
+
+        def metric(day):
+            row = activity.get(day)
+            if not row:
+                return 0
+            return row["commits"] if challenge.type == "commits" else row["changes"]
+
+        # A day is final once it is over, today can still gain commits
+        day = first_day
+        while day <= last_day and day < today:
+            value = metric(day)
+            if challenge.commitment_by == "daily":
+                met = value >= challenge.frequency
+                self.goal_bitmap = bitmaps.set_day(self.goal_bitmap, (day - challenge.start_date).days, met)
+                self.current_streak = self.current_streak + 1 if met else 0
+                self.highest_streak = max(self.highest_streak, self.current_streak)
+            self.last_processed_date = day
+            day += timedelta(days=1)
+        today_value = metric(today) if first_day <= today <= last_day else 0
+        self.derive_progress(today, today_value)
+
+    def derive_progress(self, today, today_value):
+        """
+        Derives `progress` from the running state. Daily challenges extend the streak with
+        today once `today_value` meets the goal.
+        """
+        challenge = self.challenge
 
-        progress_detail = []
-        
         # Daily Challenge Progress Calculation
         if challenge.commitment_by == "daily":
             challenge_span = ((challenge.end_date or today) - challenge.start_date).days + 1
+            # Today extends the streak once its goal is met, but does not break it before it ends
+            streak = self.current_streak + (1 if today_value >= challenge.frequency else 0)
+            self.highest_streak = max(self.highest_streak, streak)
+            self.progress = min(100, (streak / challenge_span) * 100)
+
+        # Accumulate Challenge Progress Calculation
+        elif challenge.commitment_by == "accumulate":
+            self.progress = min(100, (self.accumulated_total / challenge.target_value) * 100)
+
+    @property
+    def processed_days(self):
+        """Number of challenge days folded into the running state."""
+        if self.last_processed_date is None:
+            return 0
+        return (self.last_processed_date - self.challenge.start_date).days + 1
+
+    @classmethod
+    def apply_activity_changes(cls, user, changes):
+        """
+        Folds changed day totals into the running state of the user's challenges. Each
+        challenge's total is incremented atomically by the change inside its window and, for
+        daily challenges, the bits of days already processed are flipped and the streaks are
+        recomputed from the bitmap. The progress of every challenge whose state moved is
+        derived again before its score is published. Runs inside the ingestion transaction.
+
+        Args:
+            user (User): The user whose activity changed.
+            changes (dict): `(before, after)` activity values by date, as returned by
+                `DailyActivity.rebuild`.
+        """
+        if not changes:
+            return
+
+        user_challenges = list(
+            cls.objects.select_for_update(of=('self',)).filter(user=user).select_related('challenge')
+        )
+        today = now().date()
+        today_activity = None
+        deltas, updated = {}, []
+        for user_challenge in user_challenges:
+            challenge = user_challenge.challenge
+            metric = "commits" if challenge.type == "commits" else "changes"
+            processed_until = user_challenge.last_processed_date
+            rebuilding = user_challenge.progress_rules != challenge.rules_digest or processed_until is None
+
+            bitmap_changed = False
+            for date, (before, after) in changes.items():
+                if date < challenge.start_date or (challenge.end_date and date > challenge.end_date):
+                    continue
+                deltas[user_challenge.pk] = deltas.get(user_challenge.pk, 0) + after[metric] - before[metric]
+                if challenge.commitment_by == "daily" and not rebuilding and date <= processed_until:
+                    user_challenge.goal_bitmap = bitmaps.set_day(
+                        user_challenge.goal_bitmap,
+                        (date - challenge.start_date).days,
+                        after[metric] >= challenge.frequency,
+                    )
+                    bitmap_changed = True
 
-            commits_by_day = (
-                GitHubCommit.objects.filter(
-                    github_event__user=user,
-                    date__gte=challenge.start_date,
-                    date__lte=today
+            if bitmap_changed:
+                days = user_challenge.processed_days
+                user_challenge.current_streak = bitmaps.current_streak(user_challenge.goal_bitmap, days)
+                user_challenge.highest_streak = bitmaps.longest_streak(user_challenge.goal_bitmap, days)
+                if today_activity is None:
+                    today_activity = DailyActivity.objects.filter(
+                        user=user, date=today
+                    ).values('commits', 'changes').first() or {'commits': 0, 'changes': 0}
+                in_window = challenge.start_date <= today and not (challenge.end_date and today > challenge.end_date)
+                user_challenge.derive_progress(today, today_activity[metric] if in_window else 0)
+                updated.append(user_challenge)
+            elif challenge.commitment_by == "accumulate" and not rebuilding and deltas.get(user_challenge.pk):
+                # The rows are locked, the total the atomic increment leads to is known
+                user_challenge.accumulated_total += deltas[user_challenge.pk]
+                user_challenge.derive_progress(today, 0)
+                updated.append(user_challenge)
+
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        if deltas:
+            cls.objects.filter(pk__in=deltas).update(
+                accumulated_total=models.F('accumulated_total') + models.Case(
+                    *(models.When(pk=pk, then=models.Value(delta)) for pk, delta in deltas.items()),
+                    output_field=models.IntegerField(),
                 )
-                .values("date")
-                .annotate(
-                    total_commits=models.Count("oid"),
-                    total_changes=models.Sum(models.F("additions") + models.F("deletions"))
-                ).order_by("date")
             )
+        if updated:
+            cls.objects.bulk_update(updated, ['goal_bitmap', 'current_streak', 'highest_streak', 'progress'])
+            leaderboard.update_scores(updated)
 
-            active_days = 0
-            consecutive_days = 0
-            for commit in commits_by_day:
-                progress_detail.append({**commit, "date": commit["date"].isoformat()})
-                metric = commit["total_commits"] if challenge.type == "commits" else commit["total_changes"]
-                if metric >= challenge.frequency:
-                    active_days += 1
-                    consecutive_days += 1
-                else:
-                    consecutive_days = 0
+    def progress_detail(self, start_date, end_date):
+        """
+        Returns the progress history between two dates: the commits and changes of each active
+        day for daily challenges, the daily progress snapshots for accumulate challenges.
+        """
+        challenge = self.challenge
+        start_date = max(start_date, challenge.start_date)
+        end_date = min(end_date, challenge.end_date or end_date)
 
-            self.highest_streak = max(self.highest_streak, consecutive_days)
-            self.progress = min(100, (consecutive_days / challenge_span) * 100)
+        if challenge.commitment_by == "daily":
+            return [
+                {"date": row["date"].isoformat(), "total_commits": row["commits"], "total_changes": row["changes"]}
+                for row in DailyActivity.objects.filter(
+                    user_id=self.user_id, date__gte=start_date, date__lte=end_date
+                ).values("date", "commits", "changes").order_by("date")
+            ]
+        return [
+            {"date": date.isoformat(), "progress": progress}
+            for date, progress in self.progress_snapshots.filter(
+                date__gte=start_date, date__lte=end_date
+            ).values_list("date", "progress").order_by("date")
+        ]
 
-        # Accumulate Challenge Progress Calculation
-        elif challenge.commitment_by == "accumulate":
-            progress_detail = self.progress_detail
-            commits = GitHubCommit.objects.filter(
-                github_event__user=user,
-                date__gte=challenge.start_date,
-                date__lte=challenge.end_date or today
-            )
-            
-            if challenge.type == "commits":
-                total_commits = commits.count()
-                progress = (total_commits / challenge.target_value) * 100
-            else:  # lines_of_code
-                total_changes = commits.aggregate(
-                    total_changes=models.Sum(models.F("additions") + models.F("deletions"))
-                )["total_changes"] or 0
-                progress = (total_changes / challenge.target_value) * 100
-                
-            self.progress = min(100, progress)
-            progress_detail.append({
-                "date": today.isoformat(),
-                "progress": self.progress
-            })
-
-        self.progress_detail = progress_detail
-        self.save()
+    def update_progress(self, full=False):
+        """
+        Update progress based on challenge type and user activity.
+        Only the days after `last_processed_date` are read, unless `full` is set or the
+        challenge rules changed, which rebuilds the running state from the challenge start.
+        """
+        challenge = self.challenge
+        today = now().date()
+
+        detail_since = today - timedelta(days=settings.PROGRESS_DETAIL_DEFAULT_DAYS)
+
+        if challenge.end_date and today > challenge.end_date:
+            return {
+                "message": "Challenge already finished",
+                "progress": self.progress,
+                "progress_detail": self.progress_detail(detail_since, today),
+            }
+
+        with transaction.atomic():
+            # Reload the running state under the row lock, ingestion moves it concurrently
+            list(UserChallenge.objects.select_for_update().filter(pk=self.pk).values_list('pk'))
+            self.refresh_from_db(fields=self.PROGRESS_FIELDS)
+
+            if full:
+                self.reset_progress()
+            first_day, last_day = self.progress_window(today)
+            activity = {
+                row["date"]: row
+                for row in DailyActivity.objects.filter(
+                    user=self.user, date__gte=first_day, date__lte=last_day
+                ).values("date", "commits", "changes")
+            }
+            self.apply_progress(activity, today, first_day, last_day)
+            self.save(update_fields=self.PROGRESS_FIELDS)
+            leaderboard.update_scores([self])
+        if challenge.commitment_by == "accumulate":
+            ProgressSnapshot.record([self], today)
 
         return {
             "message": "Progress updated successfully",
             "progress": self.progress,
-            "progress_detail": self.progress_detail,
+            "progress_detail": self.progress_detail(detail_since, today),
         }
-    
\ No newline at end of file
+
+
+class ProgressSnapshot(models.Model):
+    """
+    A user's progress in an accumulate challenge at the end of a day, one row per day. History
+    older than `PROGRESS_SNAPSHOT_DAILY_DAYS` is downsampled to the last snapshot of each week.
+    Daily challenges have none, their history is read from `DailyActivity`.
+    """
+    user_challenge = models.ForeignKey(UserChallenge, on_delete=models.CASCADE, related_name='progress_snapshots')
+    date = models.DateField()
+    progress = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['user_challenge', 'date']
+
+    def __str__(self):
+        return f"{self.user_challenge_id} - {self.date} - {self.progress}%"
+
+    @classmethod
+    def record(cls, user_challenges, date):
+        """
+        Stores the current progress of `user_challenges` as their snapshot of `date`.
+        """
+        cls.objects.bulk_create(
+            [
+                cls(user_challenge=user_challenge, date=date, progress=int(user_challenge.progress))
+                for user_challenge in user_challenges
+            ],
+            update_conflicts=True,
+            unique_fields=['user_challenge', 'date'],
+            update_fields=['progress'],
+            batch_size=1000,
+        )
+
+    @classmethod
+    def downsample(cls, before):
+        """
+        Keeps only the last snapshot of each week for the days before `before`.
+        Returns the number of snapshots deleted.
+        """
+        latest = {}
+        stale = []
+        snapshots = cls.objects.filter(date__lt=before).order_by('user_challenge', 'date')
+        for pk, user_challenge_id, date in snapshots.values_list('pk', 'user_challenge_id', 'date').iterator():
+            week = (user_challenge_id, date.isocalendar()[:2])
+            if week in latest:
+                stale.append(latest[week])
+            latest[week] = pk
+
+        for offset in range(0, len(stale), 1000):
+            cls.objects.filter(pk__in=stale[offset:offset + 1000]).delete()
+        return len(stale)
@@ -3,8 +3,10 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.models import User
 from django.db import models
+import base64
 import datetime
-from rest_framework.pagination import PageNumberPagination
+
+from core.pagination import KeysetPagination
 
 from ..constants import Actions
 
@@ -107,6 +109,9 @@ class MemberManagementMixin:
                     # Handle date/datetime
                     elif isinstance(value, (datetime.date, datetime.datetime)):
                         stats_data[field.name] = value.isoformat()
+                    # Handle binary fields
+                    elif isinstance(value, (bytes, memoryview)):
+                        stats_data[field.name] = base64.b64encode(bytes(value)).decode()
                     else:
                         stats_data[field.name] = value
             
@@ -122,16 +127,15 @@ class MemberManagementMixin:
     def get_participated_resources(self, request):
         """Get all resources where user is a member with relationship details"""
         through_model = self.get_queryset().model.members.through
-        page_size = request.query_params.get('page_size', 10)
         
         # Get all relationships for this user
         relationships = through_model.objects.filter(
             user_id=request.user.id
         ).select_related('user')
         
-        # Apply pagination
-        paginator = PageNumberPagination()
-        paginator.page_size = page_size
+        # Apply pagination, newest relationships first
+        paginator = KeysetPagination()
+        paginator.ordering = ('-id',)
         page = paginator.paginate_queryset(relationships, request)
         
         # Process member details
@@ -148,6 +152,8 @@ class MemberManagementMixin:
                         stats[field.name] = str(value.id)
                     elif isinstance(value, (datetime.date, datetime.datetime)):
                         stats[field.name] = value.isoformat()
+                    elif isinstance(value, (bytes, memoryview)):
+                        stats[field.name] = base64.b64encode(bytes(value)).decode()
                     else:
                         stats[field.name] = value
             
@@ -3,6 +3,7 @@ from drf_spectacular.utils import extend_schema_field
 from typing import Optional, Dict
 from ..models.challenge import Challenge
 from ..models.user_challenge import UserChallenge 
+from .user_challenge import ProgressDetailMixin, goal_met_summary
 class ChallengeSerializer(serializers.ModelSerializer):
     background_url = serializers.SerializerMethodField()
     logo_url = serializers.SerializerMethodField()
@@ -54,9 +55,10 @@ class ChallengeSerializer(serializers.ModelSerializer):
 
         return data
 
-class ChallengeUserSerializer(serializers.ModelSerializer):
+class ChallengeUserSerializer(ProgressDetailMixin, serializers.ModelSerializer):
     user_info = serializers.SerializerMethodField()
     challenge_progress = serializers.SerializerMethodField()
+    goal_met = serializers.SerializerMethodField()
 
     class Meta:
         model = UserChallenge
@@ -66,7 +68,7 @@ class ChallengeUserSerializer(serializers.ModelSerializer):
             'start_date',
             'highest_streak',
             'progress',
-            'progress_detail'
+            'goal_met',
         ]
 
     def get_user_info(self, obj):
@@ -75,6 +77,9 @@ class ChallengeUserSerializer(serializers.ModelSerializer):
             'username': obj.user.username
         }
 
+    def get_goal_met(self, obj):
+        return goal_met_summary(obj)
+
     def get_challenge_progress(self, obj):
         return {
             'start_date': obj.start_date,
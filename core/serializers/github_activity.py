@@ -32,6 +32,13 @@ class GitHubCommitSerializer(serializers.ModelSerializer):
             'file_changes',
         ]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # File changes are only serialized when the view expands them, see `?expand=files`
+        if 'files' not in self.context.get('expand', ()):
+            fields.pop('file_changes')
+        return fields
+
 
 class GitHubEventSerializer(serializers.ModelSerializer):
     commits = GitHubCommitSerializer(many=True, read_only=True, source='githubcommit_set')
@@ -1,9 +1,79 @@
+import base64
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
 from rest_framework import serializers
 from core.models.user_challenge import UserChallenge
 from core.models.challenge import Challenge  # Assuming Challenge is imported from core
+from core.utils import goal_bitmap as bitmaps
+
+
+class ProgressDetailMixin:
+    """
+    Adds the challenge's `progress_detail` history to the representation when the request asks
+    for it with `?progress_detail=true`. The range is bounded by the `progress_from` and
+    `progress_to` ISO dates, defaulting to the last PROGRESS_DETAIL_DEFAULT_DAYS days and
+    limited to PROGRESS_DETAIL_MAX_DAYS days.
+    """
+
+    def get_progress_detail_range(self):
+        if hasattr(self, '_progress_detail_range'):
+            return self._progress_detail_range
+
+        request = self.context.get('request')
+        date_range = None
+        if request and request.query_params.get('progress_detail', '').lower() in ('true', '1'):
+            try:
+                end_date = date.fromisoformat(request.query_params.get('progress_to') or now().date().isoformat())
+                start_date = date.fromisoformat(
+                    request.query_params.get('progress_from')
+                    or (end_date - timedelta(days=settings.PROGRESS_DETAIL_DEFAULT_DAYS)).isoformat()
+                )
+            except ValueError:
+                raise serializers.ValidationError({'progress_from': 'Dates must be in ISO 8601 format.'})
+            if start_date > end_date or (end_date - start_date).days >= settings.PROGRESS_DETAIL_MAX_DAYS:
+                raise serializers.ValidationError({
+                    'progress_from': f'The range must be ordered and span at most {settings.PROGRESS_DETAIL_MAX_DAYS} days.'
+                })
+            date_range = (start_date, end_date)
+
+        self._progress_detail_range = date_range
+        return date_range
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        date_range = self.get_progress_detail_range()
+        if date_range:
+            data['progress_detail'] = instance.progress_detail(*date_range)
+        return data
+
+
+def goal_met_summary(user_challenge):
+    """
+    Compact calendar of a daily challenge: the base64 bitmap of the finished days the goal was
+    met on (bit `i` is day `i` from `start_date`, least significant bit first), with counts.
+    """
+    challenge = user_challenge.challenge
+    if challenge.commitment_by != "daily":
+        return None
+    days = user_challenge.processed_days
+    return {
+        'start_date': challenge.start_date.isoformat(),
+        'days': days,
+        'active_days': bitmaps.active_days(user_challenge.goal_bitmap, days),
+        'current_streak': user_challenge.current_streak,
+        'bitmap': base64.b64encode(bytes(user_challenge.goal_bitmap)).decode(),
+    }
+
+
+class UserChallengeSerializer(ProgressDetailMixin, serializers.ModelSerializer):
+    goal_met = serializers.SerializerMethodField()
 
-class UserChallengeSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserChallenge
-        fields = ['id', 'challenge', 'start_date', 'progress', 'progress_detail', 'highest_streak']  # Include all fields
-        read_only_fields = ('progress', 'progress_detail', 'start_date', 'highest_streak')  # Progress is updated by the system
+        fields = ['id', 'challenge', 'start_date', 'progress', 'highest_streak', 'goal_met']  # Include all fields
+        read_only_fields = ('progress', 'start_date', 'highest_streak')  # Progress is updated by the system
+
+    def get_goal_met(self, obj):
+        return goal_met_summary(obj)
@@ -0,0 +1,37 @@
+"""
+Keeps challenge leaderboards in step with challenge membership.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models.challenge import Challenge
+from core.models.user_challenge import UserChallenge
+from core.utils import leaderboard
+
+
+@receiver(post_save, sender=UserChallenge)
+def add_leaderboard_member(sender, instance, created, **kwargs):
+    if created:
+        leaderboard.update_scores([instance])
+
+
+@receiver(m2m_changed, sender=Challenge.members.through)
+def add_leaderboard_members(sender, instance, action, reverse, pk_set, **kwargs):
+    # `members.add()` creates the rows with `bulk_create`, which sends no `post_save`
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        members = UserChallenge.objects.filter(user=instance, challenge_id__in=pk_set)
+    else:
+        members = UserChallenge.objects.filter(challenge=instance, user_id__in=pk_set)
+    leaderboard.update_scores(members)
+
+
+@receiver(post_delete, sender=UserChallenge)
+def remove_leaderboard_member(sender, instance, **kwargs):
+    leaderboard.remove_members(instance.challenge_id, [instance.user_id])
+
+
+@receiver(post_delete, sender=Challenge)
+def drop_leaderboard(sender, instance, **kwargs):
+    leaderboard.drop(instance.pk)
@@ -0,0 +1,26 @@
+from celery import shared_task
+from core.utils.contribution_calendar import refresh_contribution_calendar
+from core.utils.github_client import BACKGROUND
+from django.contrib.auth.models import User
+
+
+@shared_task
+def refresh_contribution_calendar_task(user_id, year):
+    """
+    Refetch a user's stored contribution calendar in the background.
+    """
+    try:
+        user = User.objects.get(id=user_id)
+        calendar = refresh_contribution_calendar(user, year, priority=BACKGROUND)
+        if "error" in calendar:
+            return {'status': 'error', 'message': calendar['error']}
+
+        return {
+            'status': 'success',
+            'message': f'Refreshed {year} contribution calendar for user {user.username}'
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
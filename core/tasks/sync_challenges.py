@@ -1,28 +1,96 @@
 # core/tasks/tasks.py
 from celery import shared_task
-from core.models.user_challenge import UserChallenge
-from django.contrib.auth.models import User
+from core.models.challenge import Challenge
+from core.models.user_challenge import ProgressSnapshot
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+from core.utils.progress import recompute_challenge_progress, update_challenges_progress
+
+def _pending_key(user_id):
+    return f"challenge-sync:{user_id}:pending"
+
+
+def _running_key(user_id):
+    return f"challenge-sync:{user_id}:running"
+
+
+def request_challenge_sync(user_id):
+    """
+    Queue a challenge sync for the user, coalesced with the ones already requested.
+    At most one sync is pending per user: it starts CHALLENGE_SYNC_DEBOUNCE_SECONDS after the
+    first request and covers every request made until it starts.
+    Returns whether a new sync was queued.
+    """
+    debounce = settings.CHALLENGE_SYNC_DEBOUNCE_SECONDS
+    # The key outlives the countdown so a lost task does not block the user for long
+    if not cache.add(_pending_key(user_id), True, timeout=debounce + settings.CHALLENGE_SYNC_LOCK_SECONDS):
+        return False
+    update_user_challenges.apply_async(args=[user_id], countdown=debounce)
+    return True
+
 
 @shared_task
 def update_user_challenges(user_id, *args, **kwargs):
     """
     Update user's challenges based on contribution data
     """
+    if not cache.add(_running_key(user_id), True, timeout=settings.CHALLENGE_SYNC_LOCK_SECONDS):
+        # Another sync of this user is running, fold this one into a single follow-up
+        cache.delete(_pending_key(user_id))
+        request_challenge_sync(user_id)
+        return {
+            "status": "skipped",
+            "message": "A challenge sync is already running, rescheduled"
+        }
+
+    # Requests made from now on need a new run, they queue the follow-up
+    cache.delete(_pending_key(user_id))
     try:
-        user = User.objects.get(id=user_id)
-        active_challenges = UserChallenge.objects.filter(
-            user=user
-        )
-
-        for user_challenge in active_challenges:
-            user_challenge.update_progress()
-            
+        result = update_challenges_progress(user_id)
+
         return {
             "status": "success",
-            "message": f"Updated {active_challenges.count()} challenges"
+            "message": f"Updated {result['updated']} of {result['evaluated']} challenges"
         }
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
-        }
\ No newline at end of file
+        }
+    finally:
+        cache.delete(_running_key(user_id))
+
+
+@shared_task
+def recompute_challenge(challenge_id):
+    """
+    Rebuild the progress of every member of a challenge after its rules changed
+    """
+    try:
+        challenge = Challenge.objects.get(id=challenge_id)
+        updated = recompute_challenge_progress(challenge)
+
+        return {
+            "status": "success",
+            "message": f"Recomputed {updated} members of {challenge.name}"
+        }
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+
+@shared_task
+def downsample_progress_snapshots():
+    """
+    Downsample progress history older than PROGRESS_SNAPSHOT_DAILY_DAYS to one snapshot a week
+    """
+    before = now().date() - timedelta(days=settings.PROGRESS_SNAPSHOT_DAILY_DAYS)
+    deleted = ProgressSnapshot.downsample(before)
+    return {
+        "status": "success",
+        "message": f"Deleted {deleted} progress snapshots before {before}"
+    }
@@ -1,43 +1,62 @@
 # core/tasks/github_tasks.py
+import logging
+
 from celery import shared_task
-from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange
+from core.models.github_activity import GitHubSyncJob, GitHubSyncState
+from core.utils.github import fetch_commits_with_changes
+from core.utils.github_client import BACKGROUND, GitHubRateLimited
+from core.utils.ingest import ingest_commits
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import now
 from datetime import datetime
-from core.tasks.sync_challenges import update_user_challenges
+from core.tasks.sync_challenges import request_challenge_sync
+
+logger = logging.getLogger(__name__)
+
+
+def get_sync_window(start_date, end_date, crawl_started_at):
+    """
+    Returns the `update_github_commits` arguments that advance the user's sync high-water
+    marks. Only a window reaching today can advance them.
+    """
+    if end_date < crawl_started_at.date():
+        return {}
+    return {
+        'synced_from': start_date.isoformat(),
+        'synced_until': crawl_started_at.isoformat(),
+    }
 
 @shared_task
-def update_github_commits(user_id, commit_data, sync_challenges=True):
+def update_github_commits(user_id, commit_data, sync_challenges=True, synced_from=None, synced_until=None):
     """
-    Update GitHub commits in database from API data
+    Update GitHub commits in database from API data.
+    When `synced_from` and `synced_until` are given, the user's sync high-water marks are
+    advanced once the commits are stored.
     """
     try:
         user = User.objects.get(id=user_id)
-        
-        for date, commits in commit_data.items():
-            # Skip empty days
-            if not commits:
-                continue
-                
-            for commit in commits:
-                # Create or update GitHubEvent
-                event, _ = GitHubEvent.objects.get_or_create(
-                    user=user,
-                    date=datetime.fromisoformat(date).date(),
-                    defaults={'event_type': 'commit'}
-                )
-                
-                # Create or update GitHubCommit
-                GitHubCommit.objects.update_or_create(
-                    oid=commit['oid'],
-                    defaults={
-                        'github_event': event,
-                        'message': commit['message'],
-                        'additions': commit.get('additions', 0),
-                        'deletions': commit.get('deletions', 0),
-                        'date': datetime.fromisoformat(date).date()
-                    }
-                )
-        
+
+        # Upsert all commits in bulk, empty days contribute no rows
+        ingest_commits(user, [
+            {
+                'oid': commit['oid'],
+                'date': datetime.fromisoformat(date).date(),
+                'repo': commit.get('repository', ''),
+                'event_type': 'commit',
+                'message': commit['message'],
+                'additions': commit.get('additions', 0),
+                'deletions': commit.get('deletions', 0),
+                'changes': commit.get('additions', 0) + commit.get('deletions', 0),
+            }
+            for date, commits in commit_data.items()
+            for commit in commits
+        ])
+
+        if synced_from and synced_until:
+            GitHubSyncState.record_sync(user, parse_date(synced_from), parse_datetime(synced_until), commit_data)
+
         result = {
             'status': 'success',
             'message': f'Updated commits for user {user.username}'
@@ -45,7 +64,7 @@ def update_github_commits(user_id, commit_data, sync_challenges=True):
 
         # Trigger challenge sync if requested
         if sync_challenges:
-            update_user_challenges.delay(user_id)
+            request_challenge_sync(user_id)
             result['message'] += ' and triggered challenge sync'
 
         return result
@@ -55,3 +74,63 @@ def update_github_commits(user_id, commit_data, sync_challenges=True):
             'status': 'error',
             'message': str(e)
         }
+
+
+@shared_task(bind=True, max_retries=5)
+def crawl_commits_with_changes(self, job_id):
+    """
+    Runs the commits-with-changes crawl of a `GitHubSyncJob` and stores its commits.
+    Retries when the user's GitHub token is rate limited, any other error fails the job.
+    """
+    job = GitHubSyncJob.objects.select_related('user').get(id=job_id)
+    job.status = 'running'
+    job.save(update_fields=['status'])
+
+    def report_progress(repositories_crawled, repositories_found, commits_found):
+        cache.set(job.progress_key, {
+            'repositories_crawled': repositories_crawled,
+            'repositories_found': repositories_found,
+            'commits_found': commits_found,
+        }, timeout=60 * 60)
+
+    crawl_started_at = now()
+    try:
+        commit_data = fetch_commits_with_changes(
+            job.user, job.start_date, job.end_date, priority=BACKGROUND, progress=report_progress
+        )
+    except GitHubRateLimited as e:
+        if self.request.retries < self.max_retries:
+            job.status = 'pending'
+            job.save(update_fields=['status'])
+            raise self.retry(exc=e, countdown=e.countdown)
+        commit_data = {'error': str(e.detail)}
+    except Exception as e:
+        # Network and database errors must not leave the job reported as running
+        logger.exception("Crawl of sync job %s failed", job.pk)
+        commit_data = {'error': f'Crawl failed: {e}'}
+
+    if 'error' in commit_data:
+        result = {'status': 'error', 'message': commit_data['error']}
+    else:
+        result = update_github_commits(
+            job.user_id,
+            commit_data,
+            **get_sync_window(job.start_date, job.end_date, crawl_started_at),
+        )
+
+    try:
+        progress = cache.get(job.progress_key) or {}
+    except Exception:
+        logger.exception("Could not read the progress of sync job %s", job.pk)
+        progress = {}
+    job.repositories_crawled = progress.get('repositories_crawled', 0)
+    job.commits_found = progress.get('commits_found', 0)
+    job.status = 'succeeded' if result['status'] == 'success' else 'failed'
+    job.error = '' if result['status'] == 'success' else result['message']
+    job.finished_at = now()
+    job.save()
+    try:
+        cache.delete(job.progress_key)
+    except Exception:
+        logger.exception("Could not clear the progress of sync job %s", job.pk)
+    return result
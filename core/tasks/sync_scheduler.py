@@ -0,0 +1,129 @@
+import logging
+import random
+import time
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Mod
+from django.utils.timezone import now
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from core.models.github_activity import GitHubSyncState
+from core.tasks.sync_commit_data import get_sync_window, update_github_commits
+from core.utils.github import fetch_commits_with_changes
+from core.utils.github_client import BACKGROUND, GitHubRateLimited
+
+logger = logging.getLogger(__name__)
+
+SHARD_COUNTER_KEY = "github:sync:shard_counter"
+
+
+def tick_seconds():
+    return settings.GITHUB_SYNC_ACTIVE_INTERVAL_MINUTES * 60 / settings.GITHUB_SYNC_SHARDS
+
+
+def next_shard():
+    """
+    Returns the shard of the current tick. Ticks take the shards in turn from a Redis counter,
+    so a drifting beat interval can neither skip a shard nor run one twice in a pass. Without
+    Redis the shard is picked from the clock.
+    """
+    try:
+        count = get_redis_connection("default").incr(SHARD_COUNTER_KEY)
+    except RedisError as e:
+        logger.warning("Shard counter unavailable, picking the shard from the clock: %s", e)
+        return int(time.time() // tick_seconds()) % settings.GITHUB_SYNC_SHARDS
+    return (count - 1) % settings.GITHUB_SYNC_SHARDS
+
+
+def due_user_ids(shard):
+    """
+    Returns the ids of the GitHub users of `shard` that need a sync: recently active users
+    always, the others when their last sync is older than the inactive interval.
+    """
+    current_time = now()
+    recently_synced = GitHubSyncState.objects.filter(
+        user=OuterRef('pk'),
+        repo='',
+        synced_until__gte=current_time - timedelta(minutes=settings.GITHUB_SYNC_INACTIVE_INTERVAL_MINUTES),
+    )
+    return list(
+        User.objects.annotate(shard=Mod('id', settings.GITHUB_SYNC_SHARDS))
+        .filter(shard=shard, socialaccount__provider='github')
+        .filter(
+            Q(last_login__gte=current_time - timedelta(days=settings.GITHUB_SYNC_ACTIVE_DAYS))
+            | ~Exists(recently_synced)
+        )
+        .order_by('id')
+        .values_list('id', flat=True)
+        .distinct()
+    )
+
+
+@shared_task
+def schedule_github_syncs(shard=None):
+    """
+    Beat entry point. Picks the shard of the current tick and spreads its due users over
+    the tick in `GITHUB_SYNC_BATCH_SIZE` sized `sync_users` tasks, each delayed with jitter.
+    """
+    interval = tick_seconds()
+    if shard is None:
+        shard = next_shard()
+
+    user_ids = due_user_ids(shard)
+    batch_size = settings.GITHUB_SYNC_BATCH_SIZE
+    batches = [user_ids[offset:offset + batch_size] for offset in range(0, len(user_ids), batch_size)]
+    spacing = interval / max(len(batches), 1)
+    for index, batch in enumerate(batches):
+        sync_users.apply_async(args=[batch], countdown=index * spacing + random.uniform(0, spacing))
+
+    return {
+        'status': 'success',
+        'message': f'Scheduled {len(user_ids)} users of shard {shard} in {len(batches)} batches'
+    }
+
+
+@shared_task
+def sync_users(user_ids):
+    """
+    Incrementally syncs the recent commits of each user at background priority.
+    Users whose token is out of budget are skipped until their next pass, and a user whose
+    sync fails does not stop the rest of the batch.
+    """
+    end_date = now().date()
+    start_date = end_date - timedelta(days=settings.GITHUB_SYNC_WINDOW_DAYS)
+    synced, skipped, failed = 0, 0, 0
+    for user in User.objects.filter(id__in=user_ids):
+        crawl_started_at = now()
+        try:
+            commit_data = fetch_commits_with_changes(user, start_date, end_date, priority=BACKGROUND)
+            if 'error' in commit_data:
+                logger.warning("Periodic sync of %s failed: %s", user.username, commit_data['error'])
+                skipped += 1
+                continue
+            result = update_github_commits(
+                user.id, commit_data, **get_sync_window(start_date, end_date, crawl_started_at)
+            )
+        except GitHubRateLimited as e:
+            logger.info("Skipping periodic sync of %s: %s", user.username, e.detail)
+            skipped += 1
+            continue
+        except Exception:
+            # Network and database errors only fail this user
+            logger.exception("Periodic sync of %s failed", user.username)
+            failed += 1
+            continue
+        if result.get('status') == 'error':
+            logger.warning("Storing the periodic sync of %s failed: %s", user.username, result['message'])
+            failed += 1
+            continue
+        synced += 1
+
+    return {
+        'status': 'success',
+        'message': f'Synced {synced} users, skipped {skipped}, failed {failed}'
+    }
@@ -1,3 +1,338 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from core.models.challenge import Challenge
+from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange, GitHubSyncState
+from core.models.user_challenge import ProgressSnapshot, UserChallenge
+from core.utils import progress
+from core.utils.github import fetch_commits_with_changes
+from core.utils.ingest import ingest_commits
+
+
+class GitHubActivityQueryCountTests(TestCase):
+    """
+    List responses of the GitHub activity viewsets run a fixed number of queries, whatever the
+    number of events, commits and file changes on the page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='octocat')
+        cls.other = User.objects.create(username='hubot')
+        for user in (cls.user, cls.other):
+            for day in range(5):
+                event = GitHubEvent.objects.create(
+                    user=user, date=date(2026, 1, 1) + timedelta(days=day), event_type='commit', repo='daily50'
+                )
+                for number in range(3):
+                    commit = GitHubCommit.objects.create(
+                        oid=f'{user.username}-{day}-{number}',
+                        github_event=event,
+                        user=user,
+                        repo=event.repo,
+                        date=event.date,
+                        message='message',
+                        url='',
+                    )
+                    for name in ('a.py', 'b.py'):
+                        GithubFileChange.objects.create(github_commit=commit, filename=name, sha='', status='modified')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_events_list(self):
+        # Events and their commits
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/github/events/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertEqual(len(response.data['results'][0]['commits']), 3)
+        self.assertNotIn('file_changes', response.data['results'][0]['commits'][0])
+
+    def test_events_list_expanded(self):
+        # Events, their commits and the commits' file changes
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/github/events/?expand=files')
+        self.assertEqual(len(response.data['results'][0]['commits'][0]['file_changes']), 2)
+
+    def test_commits_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/github/commits/?page_size=15')
+        self.assertEqual(len(response.data['results']), 15)
+        self.assertNotIn('file_changes', response.data['results'][0])
+
+    def test_commits_list_expanded(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/github/commits/?page_size=15&expand=files')
+        self.assertEqual(len(response.data['results'][0]['file_changes']), 2)
+
+    def test_lists_are_scoped_to_the_user(self):
+        response = self.client.get('/api/github/commits/?page_size=100')
+        self.assertTrue(all(commit['oid'].startswith('octocat-') for commit in response.data['results']))
+        response = self.client.get('/api/github/changes/?count=true')
+        self.assertEqual(response.data['count'], 30)
+
+
+class ProgressEngineEquivalenceTests(TestCase):
+    """
+    Every progress engine, incremental updates folding late commits, the per-challenge
+    recompute and its SQL and Python streak queries, ends in the state of a full
+    `update_progress` rebuild.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = now().date()
+        start = cls.today - timedelta(days=20)
+        challenges = [
+            dict(type='commits', commitment_by='daily', frequency=2),
+            dict(type='lines_of_code', commitment_by='daily', frequency=10),
+            dict(type='commits', commitment_by='daily', frequency=0, end_date=cls.today + timedelta(days=5)),
+            dict(type='commits', commitment_by='accumulate', target_value=40),
+            dict(type='lines_of_code', commitment_by='accumulate', target_value=500,
+                 end_date=cls.today + timedelta(days=5)),
+        ]
+        cls.users = [User.objects.create(username=name) for name in ('octocat', 'hubot', 'monalisa')]
+        cls.challenges = [
+            Challenge.objects.create(
+                name=f'challenge {number}', description='', start_date=start, created_by=cls.users[0], **fields
+            )
+            for number, fields in enumerate(challenges)
+        ]
+        for user in cls.users:
+            for challenge in cls.challenges:
+                UserChallenge.objects.create(user=user, challenge=challenge, start_date=start)
+
+    def commits(self, user, offsets, count=2, additions=6):
+        """Commit rows of `user`, `count` on each of the days `offsets` days before today."""
+        return [
+            {
+                'oid': f'{user.username}-{offset}-{number}',
+                'date': self.today - timedelta(days=offset),
+                'repo': 'daily50',
+                'additions': additions,
+                'deletions': 0,
+            }
+            for offset in offsets
+            for number in range(count)
+        ]
+
+    def ingest_history(self):
+        for index, user in enumerate(self.users):
+            # Distinct gaps per user, the last one met the goals up to yesterday
+            offsets = [offset for offset in range(21) if offset % (index + 2) or index == 2]
+            ingest_commits(user, self.commits(user, offsets))
+
+    def progress_state(self):
+        return {
+            user_challenge.pk: (
+                user_challenge.progress,
+                user_challenge.highest_streak,
+                user_challenge.current_streak,
+                user_challenge.accumulated_total,
+                user_challenge.last_processed_date,
+                user_challenge.progress_rules,
+                # Clearing a bit can leave trailing zero bytes, only the days set matter
+                int.from_bytes(bytes(user_challenge.goal_bitmap), 'little'),
+            )
+            for user_challenge in UserChallenge.objects.order_by('pk')
+        }
+
+    def assertMatchesFullRebuild(self):
+        state = self.progress_state()
+        for user_challenge in UserChallenge.objects.select_related('challenge', 'user'):
+            user_challenge.update_progress(full=True)
+        self.assertEqual(state, self.progress_state())
+        # Daily history is read from the activity rollup, only accumulate progress is snapshotted
+        snapshotted = set(ProgressSnapshot.objects.values_list('user_challenge__challenge__commitment_by', flat=True))
+        self.assertEqual(snapshotted, {'accumulate'})
+
+    def test_incremental_updates_with_late_commits(self):
+        self.ingest_history()
+        for user in self.users:
+            progress.update_challenges_progress(user.id, today=self.today - timedelta(days=8))
+
+        octocat, hubot, _ = self.users
+        # A late commit completes a processed day that missed the goal
+        ingest_commits(octocat, self.commits(octocat, [10], count=1)[:1])
+        ingest_commits(octocat, [{**self.commits(octocat, [10], count=3)[2], 'additions': 2}])
+        # A commit moved off a processed day breaks the goal of that day
+        ingest_commits(hubot, [{**self.commits(hubot, [13])[0], 'date': self.today - timedelta(days=3)}])
+        # New days, today included
+        ingest_commits(hubot, self.commits(hubot, [1, 0], count=3))
+
+        for user in self.users:
+            progress.update_challenges_progress(user.id, today=self.today - timedelta(days=4))
+            progress.update_challenges_progress(user.id)
+        self.assertMatchesFullRebuild()
+
+    def test_late_commits_keep_progress_current(self):
+        self.ingest_history()
+        for user in self.users:
+            progress.update_challenges_progress(user.id)
+        monalisa = self.users[2]
+        self.assertEqual(UserChallenge.objects.get(user=monalisa, challenge=self.challenges[0]).highest_streak, 21)
+
+        # Already met processed day, the streak still counts today
+        ingest_commits(monalisa, self.commits(monalisa, [5], count=3)[2:])
+        self.assertEqual(UserChallenge.objects.get(user=monalisa, challenge=self.challenges[0]).highest_streak, 21)
+        # Processed day flipping to met, and accumulate totals moving, without an update
+        octocat = self.users[0]
+        ingest_commits(octocat, self.commits(octocat, [4], count=2))
+        self.assertMatchesFullRebuild()
+
+    def test_commit_taken_over_by_another_user(self):
+        self.ingest_history()
+        for user in self.users:
+            progress.update_challenges_progress(user.id)
+        octocat, hubot, _ = self.users
+
+        # The oid is the primary key, the commit moves to its last ingesting user
+        ingest_commits(hubot, [{**self.commits(octocat, [1])[0], 'additions': 50}])
+        self.assertEqual(GitHubCommit.objects.get(oid='octocat-1-0').user, hubot)
+        self.assertEqual(octocat.daily_activities.get(date=self.today - timedelta(days=1)).commits, 1)
+        self.assertMatchesFullRebuild()
+
+    def test_recompute_challenge_progress(self):
+        self.ingest_history()
+        ingest_commits(self.users[0], self.commits(self.users[0], [0], count=3))
+        for challenge in self.challenges:
+            progress.recompute_challenge_progress(challenge)
+        self.assertMatchesFullRebuild()
+
+    def test_sql_and_python_member_streaks_agree(self):
+        self.ingest_history()
+        final_day = self.today - timedelta(days=1)
+        for challenge in self.challenges:
+            args = (challenge, challenge.start_date, final_day, self.today, challenge.end_date or date.max)
+            self.assertEqual(progress._member_streaks_sql(*args), progress._member_streaks_python(*args))
+
+
+@override_settings(GITHUB_SYNC_OVERLAP_MINUTES=60)
+class GitHubSyncStateTests(TestCase):
+    """
+    The user's mark only vouches for commits actually synced, and per-repository heads only
+    move forward.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username='octocat')
+        self.state = GitHubSyncState.objects.create(
+            user=self.user,
+            repo='',
+            synced_from=date(2026, 1, 1),
+            synced_until=datetime(2026, 1, 20, 12, tzinfo=timezone.utc),
+        )
+
+    def test_delta_since(self):
+        self.assertEqual(self.state.delta_since(date(2026, 1, 5)), datetime(2026, 1, 20, 11, tzinfo=timezone.utc))
+        # Windows starting before or after the synced range are not covered
+        self.assertIsNone(self.state.delta_since(date(2025, 12, 31)))
+        self.assertIsNone(self.state.delta_since(date(2026, 1, 21)))
+
+    def test_record_sync_extends_a_touching_range(self):
+        GitHubSyncState.record_sync(self.user, date(2026, 1, 15), datetime(2026, 1, 25, tzinfo=timezone.utc), {})
+        self.state.refresh_from_db()
+        self.assertEqual(self.state.synced_from, date(2026, 1, 1))
+        self.assertEqual(self.state.synced_until, datetime(2026, 1, 25, tzinfo=timezone.utc))
+
+    def test_record_sync_replaces_the_range_across_a_gap(self):
+        GitHubSyncState.record_sync(self.user, date(2026, 2, 10), datetime(2026, 2, 20, tzinfo=timezone.utc), {})
+        self.state.refresh_from_db()
+        self.assertEqual(self.state.synced_from, date(2026, 2, 10))
+        self.assertEqual(self.state.synced_until, datetime(2026, 2, 20, tzinfo=timezone.utc))
+        self.assertIsNone(self.state.delta_since(date(2026, 1, 1)))
+
+    def test_record_sync_moves_repository_heads_forward(self):
+        def sync(oid, committed_date):
+            GitHubSyncState.record_sync(
+                self.user,
+                date(2026, 1, 1),
+                datetime(2026, 1, 25, tzinfo=timezone.utc),
+                {committed_date[:10]: [{'oid': oid, 'repository': 'octocat/daily50', 'committed_date': committed_date}]},
+            )
+            return GitHubSyncState.objects.get(user=self.user, repo='octocat/daily50').cursor
+
+        self.assertEqual(sync('b', '2026-01-22T10:00:00Z'), 'b')
+        self.assertEqual(sync('a', '2026-01-21T10:00:00Z'), 'b')
+        self.assertEqual(sync('c', '2026-01-23T10:00:00Z'), 'c')
+
+
+class FakeGitHubClient:
+    """
+    Serves one repository whose default branch history is split in `pages` of commit nodes,
+    and records the history cursors requested.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.cursors = []
+        self.variables = []
+        self.concurrency = mock.Mock(**{'acquire.return_value': 'lease'})
+
+    def history(self, number):
+        return {
+            'pageInfo': {'hasNextPage': number < len(self.pages) - 1, 'endCursor': str(number + 1)},
+            'edges': [{'node': node} for node in self.pages[number]],
+        }
+
+    def graphql(self, query, variables):
+        self.variables.append(variables)
+        if 'commitCursor' in variables and variables['commitCursor']:
+            self.cursors.append(variables['commitCursor'])
+            history = self.history(int(variables['commitCursor']))
+            return {'data': {'repository': {'defaultBranchRef': {'target': {'history': history}}}}}
+        repository = {'name': 'daily50', 'owner': {'login': 'octocat'}, 'defaultBranchRef': {'target': {'history': self.history(0)}}}
+        return {'data': {'user': {'repositories': {'pageInfo': {'hasNextPage': False}, 'nodes': [repository]}}}}
+
+
+@override_settings(GITHUB_SYNC_OVERLAP_MINUTES=60)
+class DeltaCrawlTests(TestCase):
+    """
+    A delta crawl pages each repository until its last synced commit, whatever the commit
+    timestamps, and only leaves out the commits stored for the same user.
+    """
+
+    @staticmethod
+    def node(oid, committed_date):
+        return {'oid': oid, 'committedDate': committed_date, 'additions': 1, 'deletions': 0, 'message': oid}
+
+    @staticmethod
+    def store(user, oid, day):
+        event = GitHubEvent.objects.create(user=user, date=day, event_type='commit', repo='octocat/daily50')
+        GitHubCommit.objects.create(
+            oid=oid, github_event=event, user=user, repo=event.repo, date=day, message=oid, url=''
+        )
+
+    def test_pages_until_the_known_head(self):
+        user = User.objects.create(username='octocat')
+        collaborator = User.objects.create(username='hubot')
+        GitHubSyncState.objects.create(
+            user=user, repo='', synced_from=date(2026, 1, 1), synced_until=datetime(2026, 1, 20, 12, tzinfo=timezone.utc)
+        )
+        GitHubSyncState.objects.create(
+            user=user, repo='octocat/daily50', cursor='head', last_commit_at=datetime(2026, 1, 20, 10, tzinfo=timezone.utc)
+        )
+        self.store(user, 'head', date(2026, 1, 20))
+        self.store(user, 'old', date(2026, 1, 3))
+        self.store(collaborator, 'new', date(2026, 1, 25))
+
+        client = FakeGitHubClient([
+            # `merged` reached the default branch with a merge, dated before the mark's overlap
+            [self.node('new', '2026-01-25T09:00:00Z'), self.node('merged', '2026-01-20T10:30:00Z')],
+            [self.node('head', '2026-01-20T10:00:00Z'), self.node('old', '2026-01-03T09:00:00Z')],
+            [self.node('older', '2026-01-02T09:00:00Z')],
+        ])
+        with mock.patch('core.utils.github.get_github_client', return_value=client):
+            commit_details = fetch_commits_with_changes(user, date(2026, 1, 1), date(2026, 1, 31))
+
+        oids = {commit['oid'] for commits in commit_details.values() for commit in commits}
+        self.assertEqual(oids, {'new', 'merged'})
+        self.assertEqual(client.cursors, ['1'])
+        self.assertTrue(all(variables['start_date'] == '2026-01-01T00:00:00Z' for variables in client.variables))
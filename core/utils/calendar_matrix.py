@@ -0,0 +1,103 @@
+"""
+Vectorized streak and goal computations over contribution calendars.
+
+A calendar year is held as an int32 array of contribution counts indexed by day of year
+(January 1st is index 0), and the calendars of many users are stacked into a matrix with one
+row per user. Streaks and daily goal progress are then computed for every row at once.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from core.models.github_activity import ContributionCalendar
+
+
+def days_in_year(year):
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+
+def calendar_to_array(contribution_calendar, year):
+    """
+    Converts a `contributionCalendar` object into an int32 array of counts by day of year.
+    Days outside `year` are ignored.
+    """
+    counts = np.zeros(days_in_year(year), dtype=np.int32)
+    days = [day for week in contribution_calendar["weeks"] for day in week["contributionDays"]]
+    if not days:
+        return counts
+
+    values = np.fromiter((day["contributionCount"] for day in days), dtype=np.int32, count=len(days))
+    first = date.fromisoformat(days[0]["date"])
+    if date.fromisoformat(days[-1]["date"]) == first + timedelta(days=len(days) - 1):
+        # GitHub lists consecutive days, only the first one has to be parsed
+        offsets = np.arange(len(days)) + (first - date(year, 1, 1)).days
+    else:
+        offsets = np.fromiter(
+            ((date.fromisoformat(day["date"]) - date(year, 1, 1)).days for day in days),
+            dtype=np.int64,
+            count=len(days),
+        )
+    inside = (offsets >= 0) & (offsets < len(counts))
+    counts[offsets[inside]] = values[inside]
+    return counts
+
+
+def calendar_matrix(calendars, year):
+    """
+    Stacks contribution calendars into a `(len(calendars), days_in_year)` int32 matrix.
+    """
+    matrix = np.zeros((len(calendars), days_in_year(year)), dtype=np.int32)
+    for row, contribution_calendar in enumerate(calendars):
+        matrix[row] = calendar_to_array(contribution_calendar, year)
+    return matrix
+
+
+def load_calendar_matrix(user_ids, year):
+    """
+    Builds the matrix of the stored `ContributionCalendar` of each user, in `user_ids` order.
+    Users without a stored calendar get an empty row.
+    """
+    stored = dict(
+        ContributionCalendar.objects.filter(user_id__in=user_ids, year=year).values_list("user_id", "calendar")
+    )
+    return calendar_matrix([stored.get(user_id, {"weeks": []}) for user_id in user_ids], year)
+
+
+def activity_streaks(matrix, daily_goal, days=None):
+    """
+    Computes the current and longest streak of days meeting `daily_goal` for every row.
+
+    Args:
+        matrix (np.ndarray): Counts by day, one row per user (a single 1-D calendar works too).
+        daily_goal (int): Contributions a day needs to count towards a streak.
+        days (int): Only the first `days` days are considered, e.g. the days before today.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The current streak (ending on the last considered day)
+        and the longest streak of each row.
+    """
+    matrix = np.atleast_2d(matrix)
+    met = matrix[:, :days] >= daily_goal
+    if met.shape[1] == 0:
+        empty = np.zeros(met.shape[0], dtype=np.int32)
+        return empty, empty
+
+    # Each day's run length is its index minus the index of the last day that missed the goal
+    index = np.arange(met.shape[1])
+    last_miss = np.maximum.accumulate(np.where(met, -1, index), axis=1)
+    run_length = (index - last_miss).astype(np.int32)
+    return run_length[:, -1], run_length.max(axis=1)
+
+
+def daily_goal_progress(matrix, daily_goal, day_index):
+    """
+    Computes the contributions of day `day_index` and the progress towards `daily_goal`
+    in percent for every row.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The day's contributions and progress of each row.
+    """
+    matrix = np.atleast_2d(matrix)
+    contributions = matrix[:, day_index]
+    progress = np.minimum(contributions / daily_goal, 1.0) * 100
+    return contributions, progress
@@ -0,0 +1,86 @@
+"""
+Store for GitHub contribution calendars.
+
+Calendars are read from the cache, then from the `ContributionCalendar` table, and only fetched
+from GitHub when neither has them. Years that ended before their calendar was fetched are final
+and cached without expiry. The current year is fresh for `GITHUB_CALENDAR_TTL` seconds, after
+which the stored copy keeps being served while a background task refreshes it.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from core.models.github_activity import ContributionCalendar
+from core.utils.github import fetch_contribution_calendar
+from core.utils.github_client import INTERACTIVE
+
+CACHE_PREFIX = "contribution-calendar"
+
+
+def _cache_key(user_id, year):
+    return f"{CACHE_PREFIX}:{user_id}:{year}"
+
+
+def _cache_entry(entry):
+    cache.set(
+        _cache_key(entry.user_id, entry.year),
+        {"calendar": entry.calendar, "fetched_at": entry.fetched_at, "final": entry.is_final},
+        timeout=None if entry.is_final else settings.GITHUB_HTTP_CACHE_TIMEOUT,
+    )
+
+
+def refresh_contribution_calendar(user, year, priority=INTERACTIVE):
+    """
+    Fetches the user's calendar for `year` from GitHub and stores it.
+
+    Returns:
+        dict: The `contributionCalendar` object, or a dict with an `error` key.
+    """
+    data = fetch_contribution_calendar(user, year, priority)
+    if "error" in data:
+        return data
+    if not (data.get("data") or {}).get("user"):
+        return {"error": "Failed to fetch contribution calendar."}
+
+    entry, _ = ContributionCalendar.objects.update_or_create(
+        user=user,
+        year=year,
+        defaults={
+            "calendar": data["data"]["user"]["contributionsCollection"]["contributionCalendar"],
+            "fetched_at": now(),
+        },
+    )
+    _cache_entry(entry)
+    return entry.calendar
+
+
+def get_contribution_calendar(user, year=None):
+    """
+    Returns the user's contribution calendar for `year` (default: the current year), fetching
+    it from GitHub only when it was never stored.
+
+    Returns:
+        dict: The `contributionCalendar` object, or a dict with an `error` key.
+    """
+    if year is None:
+        year = now().year
+
+    cached = cache.get(_cache_key(user.id, year))
+    if cached is None:
+        entry = ContributionCalendar.objects.filter(user=user, year=year).first()
+        if entry is None:
+            return refresh_contribution_calendar(user, year)
+        _cache_entry(entry)
+        cached = {"calendar": entry.calendar, "fetched_at": entry.fetched_at, "final": entry.is_final}
+
+    stale = now() - cached["fetched_at"] > timedelta(seconds=settings.GITHUB_CALENDAR_TTL)
+    # The lock lets a single refresh be queued per calendar and TTL
+    if not cached["final"] and stale and cache.add(
+        f"{_cache_key(user.id, year)}:refreshing", True, timeout=settings.GITHUB_CALENDAR_TTL
+    ):
+        from core.tasks.contribution_calendar import refresh_contribution_calendar_task
+
+        refresh_contribution_calendar_task.delay(user.id, year)
+    return cached["calendar"]
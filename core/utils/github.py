@@ -1,10 +1,100 @@
 from allauth.socialaccount.models import SocialToken
-import requests
+import asyncio
+import random
+from django.conf import settings
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now
-from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange
+from core.models.github_activity import GitHubCommit, GithubFileChange, GitHubSyncState
+from core.utils.github_cache import cached_get
+from core.utils.github_client import GitHubClient, GitHubError, INTERACTIVE
+from core.utils.ingest import ingest_commits
 from datetime import datetime, timedelta
 
-GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+# Commit fields requested for every node of a repository's default branch history
+COMMIT_HISTORY_FRAGMENT = """
+fragment commitHistory on Commit {
+  history(since: $start_date, until: $end_date, first: 100, after: $commitCursor) {
+    pageInfo {
+      endCursor
+      hasNextPage
+    }
+    edges {
+      node {
+        committedDate
+        additions
+        deletions
+        oid
+        message
+      }
+    }
+  }
+}
+"""
+
+# First page of repositories, each with the first page of its commit history
+REPOSITORIES_QUERY = """
+query($username: String!, $start_date: GitTimestamp!, $end_date: GitTimestamp!, $repoCursor: String, $commitCursor: String) {
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+  user(login: $username) {
+    repositories(first: 100, after: $repoCursor) {
+      pageInfo {
+        endCursor
+        hasNextPage
+      }
+      nodes {
+        name
+        owner {
+          login
+        }
+        defaultBranchRef {
+          target {
+            ...commitHistory
+          }
+        }
+      }
+    }
+  }
+}
+""" + COMMIT_HISTORY_FRAGMENT
+
+# Follow-up pages of a single repository's commit history
+REPOSITORY_HISTORY_QUERY = """
+query($owner: String!, $name: String!, $start_date: GitTimestamp!, $end_date: GitTimestamp!, $commitCursor: String) {
+  rateLimit {
+    cost
+    remaining
+    resetAt
+  }
+  repository(owner: $owner, name: $name) {
+    defaultBranchRef {
+      target {
+        ...commitHistory
+      }
+    }
+  }
+}
+""" + COMMIT_HISTORY_FRAGMENT
+
+# Fields resolved per commit by the aliased `object(oid:)` lookups of `fetch_commit_stats`
+COMMIT_STATS_FRAGMENT = """
+fragment commitStats on Commit {
+  oid
+  additions
+  deletions
+  changedFilesIfAvailable
+  committedDate
+  committer {
+    name
+    email
+    date
+  }
+}
+"""
+
 
 def initialize_commit_details(start_date, end_date):
     """
@@ -28,120 +118,243 @@ def initialize_commit_details(start_date, end_date):
         current_date += timedelta(days=1)
     return commit_details
 
-def fetch_commits_with_changes(user, start_date, end_date):
+def fetch_commits_with_changes(user, start_date, end_date, priority=INTERACTIVE, progress=None):
     """
     Fetches the daily commits with changes (additions, deletions) and their details for the user
-    using the GitHub GraphQL API. Handles pagination for both repositories and commits.
+    using the GitHub GraphQL API. Repository pages are walked in order while the remaining
+    commit history pages of every repository are crawled concurrently, bounded by
+    `GITHUB_CRAWL_CONCURRENCY` in-flight requests for the user's token across all processes.
+
+    When a previous sync already covers the window, each repository's history is only paged
+    until its last synced commit. Commit timestamps alone are not trusted: a branch merged
+    later brings commits dated before the user's high-water mark. A window that ends before
+    the mark is not crawled again, so commits merged afterwards with dates inside it are
+    missed until a sync starting before the mark crawls it in full. Commits that are
+    already stored for the user are left out of the result, see `include_stored_commits` to
+    merge them back for a full view of the window.
+
+    `progress`, if given, receives the crawl counts as described in `_crawl_commit_history`.
+    Raises `GitHubRateLimited` when the token has no budget left for the given priority.
     """
-    token = get_github_access_token(user)
-    if not token:
+    client = get_github_client(user, priority)
+    if not client:
         return {"error": "GitHub token not found for this user."}
 
-    headers = {"Authorization": f"Bearer {token}"}
+    sync_states = {state.repo: state for state in GitHubSyncState.objects.filter(user=user)}
+    user_state = sync_states.pop("", None)
+    since = user_state.delta_since(start_date) if user_state else None
+    known_heads = {repo: state.cursor for repo, state in sync_states.items() if since and state.cursor}
 
     # Ensure dates are formatted as ISO-8601 strings with timezone information
     start_date = f"{start_date}T00:00:00Z"
     end_date = f"{end_date}T23:59:59Z"
 
-    # GraphQL query with pagination for repositories and commits
-    query = """
-    query($username: String!, $start_date: GitTimestamp!, $end_date: GitTimestamp!, $repoCursor: String, $commitCursor: String) {
-      user(login: $username) {
-        repositories(first: 100, after: $repoCursor) {
-          pageInfo {
-            endCursor
-            hasNextPage
-          }
-          nodes {
-            name
-            defaultBranchRef {
-              target {
-                ... on Commit {
-                  history(since: $start_date, until: $end_date, first: 100, after: $commitCursor) {
-                    pageInfo {
-                      endCursor
-                      hasNextPage
-                    }
-                    edges {
-                      node {
-                        committedDate
-                        additions
-                        deletions
-                        oid
-                        message
-                      }
-                    }
-                  }
-                }
-              }
-            }
-          }
+    commit_details = initialize_commit_details(start_date, end_date)
+
+    commits = []
+    # Nothing to request when the window ends before the mark
+    if not since or since.strftime("%Y-%m-%dT%H:%M:%SZ") <= end_date:
+        try:
+            commits = asyncio.run(
+                _crawl_commit_history(client, user.username, start_date, end_date, known_heads, progress)
+            )
+        except GitHubError as e:
+            return {"error": f"Failed to fetch commits. {e}"}
+
+    stored_oids = set(
+        GitHubCommit.objects.filter(
+            user=user, oid__in=[commit["oid"] for commit in commits]
+        ).values_list("oid", flat=True)
+    )
+
+    for commit_data in commits:
+        if commit_data["oid"] in stored_oids:
+            continue
+        commit_date = commit_data["committedDate"][:10]  # Extract YYYY-MM-DD
+        commit_entry = {
+            "oid": commit_data["oid"],
+            "message": commit_data["message"],
+            "additions": commit_data["additions"],
+            "deletions": commit_data["deletions"],
+            "repository": commit_data["repository"],
+            "committed_date": commit_data["committedDate"],
         }
-      }
-    }
+        commit_details.setdefault(commit_date, []).append(commit_entry)
+
+    return commit_details
+
+
+def include_stored_commits(user, commit_details):
+    """
+    Adds the commits already stored for the user to the days of `commit_details`, skipping
+    commits that are present in it.
     """
+    if not commit_details:
+        return commit_details
+
+    seen = {commit["oid"] for commits in commit_details.values() for commit in commits}
+    stored_commits = GitHubCommit.objects.filter(
+        user=user,
+        date__gte=min(commit_details),
+        date__lte=max(commit_details),
+    ).values("oid", "message", "additions", "deletions", "date", "repo").order_by("date")
+
+    for commit in stored_commits:
+        if commit["oid"] in seen:
+            continue
+        commit_details.setdefault(commit["date"].isoformat(), []).append({
+            "oid": commit["oid"],
+            "message": commit["message"],
+            "additions": commit["additions"],
+            "deletions": commit["deletions"],
+            "repository": commit["repo"],
+        })
+    return commit_details
 
-    variables = {
-        "username": user.username,
-        "start_date": start_date,
-        "end_date": end_date,
-        "repoCursor": None,
-        "commitCursor": None,
-    }
-    commit_details = initialize_commit_details(start_date, end_date)
 
+async def _acquire_token_slot(client):
+    """Waits for one of the token's concurrency slots, shared with every other crawl of it."""
+    while True:
+        lease = client.concurrency.acquire()
+        if lease is not None:
+            return lease
+        await asyncio.sleep(random.uniform(0.05, 0.25))
 
-    while True:  # Loop for repository pagination
-        response = requests.post(
-            GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables}, headers=headers
-        )
 
-        if response.status_code != 200:
-            return {"error": f"Failed to fetch commits. {response.json()}"}
+async def _post_graphql(client, query, variables, semaphore):
+    """
+    Runs a single GraphQL request in a worker thread, holding a slot of the crawl's semaphore
+    and one of the token's concurrency slots for the duration of the round trip.
+    """
+    async with semaphore:
+        lease = await _acquire_token_slot(client)
+        try:
+            data = await asyncio.to_thread(client.graphql, query, variables)
+        finally:
+            client.concurrency.release(lease)
+
+    if data.get("errors") and not data.get("data"):
+        raise GitHubError(str(data["errors"]))
+    return data.get("data") or {}
 
-        data = response.json()
-        user_data = data.get("data", {}).get("user", {})
-        repositories = user_data.get("repositories", {}).get("nodes", [])
-        repo_page_info = user_data.get("repositories", {}).get("pageInfo", {})
 
-        # Process each repository
-        for repo in repositories:
-            if not repo.get("defaultBranchRef"):
-                continue
+def _get_history(repository):
+    """Returns the default branch commit history connection of a repository node, if any."""
+    ref = (repository or {}).get("defaultBranchRef") or {}
+    return (ref.get("target") or {}).get("history")
 
-            # Fetch commits with pagination for each repository
-            while True:  # Loop for commit pagination within a repository
-                history = repo["defaultBranchRef"]["target"].get("history", {})
-                for commit in history.get("edges", []):
-                    commit_data = commit["node"]
-                    commit_date = commit_data["committedDate"][:10]  # Extract YYYY-MM-DD
-                    commit_entry = {
-                        "oid": commit_data["oid"],
-                        "message": commit_data["message"],
-                        "additions": commit_data["additions"],
-                        "deletions": commit_data["deletions"],
-                    }
-
-                    if commit_date not in commit_details:
-                        commit_details[commit_date] = []
-
-                    commit_details[commit_date].append(commit_entry)
-
-                # Update commit cursor and check if there's another page
-                commit_page_info = history.get("pageInfo", {})
-                if commit_page_info.get("hasNextPage"):
-                    variables["commitCursor"] = commit_page_info["endCursor"]
-                else:
-                    variables["commitCursor"] = None
-                    break
-
-        # Update repository cursor and check if there's another page
-        if repo_page_info.get("hasNextPage"):
-            variables["repoCursor"] = repo_page_info["endCursor"]
-        else:
+
+def _history_commits(history, repository_name, known_head=None):
+    """
+    Returns the commit nodes of a history page tagged with their repository, and whether the
+    page reached `known_head`, the newest commit of the repository that is already synced.
+    """
+    commits = [{**edge["node"], "repository": repository_name} for edge in history.get("edges", [])]
+    reached_head = bool(known_head) and any(commit["oid"] == known_head for commit in commits)
+    return commits, reached_head
+
+
+async def _crawl_repository_history(client, repository, history, variables, semaphore, known_head=None):
+    """
+    Follows the `history` cursor of a single repository until its last page, re-querying the
+    repository for every page after the first one. History is ordered newest first, so the
+    crawl stops early once the page containing `known_head` has been read.
+    """
+    repository_name = f"{repository['owner']['login']}/{repository['name']}"
+    commits = []
+    while history.get("pageInfo", {}).get("hasNextPage"):
+        data = await _post_graphql(
+            client,
+            REPOSITORY_HISTORY_QUERY,
+            {
+                **variables,
+                "owner": repository["owner"]["login"],
+                "name": repository["name"],
+                "commitCursor": history["pageInfo"]["endCursor"],
+            },
+            semaphore,
+        )
+        history = _get_history(data.get("repository"))
+        if not history:
+            break
+        page_commits, reached_head = _history_commits(history, repository_name, known_head)
+        commits.extend(page_commits)
+        if reached_head:
             break
+    return commits
+
+
+async def _crawl_commit_history(client, username, start_date, end_date, known_heads=None, progress=None):
+    """
+    Crawls the commit history of every repository owned by `username` between the given
+    ISO-8601 timestamps and returns the flat list of commit nodes, each tagged with its
+    `owner/name` repository. `known_heads` maps repositories to their newest synced commit.
+
+    Repository pages are cursor-chained and therefore fetched one after another, but as soon
+    as a page arrives the follow-up history pages of its repositories are scheduled, so the
+    total wall time is bound by the longest repository history rather than the sum of them.
+
+    `progress` is called from the event loop with the running `repositories_crawled`,
+    `repositories_found` and `commits_found` counts, so it must not use the ORM.
+    """
+    semaphore = asyncio.Semaphore(settings.GITHUB_CRAWL_CONCURRENCY)
+    variables = {"start_date": start_date, "end_date": end_date}
+    commits = []
+    history_tasks = []
+    counts = {"repositories_crawled": 0, "repositories_found": 0, "commits_found": 0}
+
+    def report(**increments):
+        for name, increment in increments.items():
+            counts[name] += increment
+        if progress:
+            progress(**counts)
+
+    def on_history_done(task):
+        if not task.cancelled() and task.exception() is None:
+            report(repositories_crawled=1, commits_found=len(task.result()))
+
+    try:
+        repo_cursor = None
+        while True:  # Loop for repository pagination
+            data = await _post_graphql(
+                client,
+                REPOSITORIES_QUERY,
+                {**variables, "username": username, "repoCursor": repo_cursor},
+                semaphore,
+            )
+            repositories = (data.get("user") or {}).get("repositories") or {}
+
+            for repo in repositories.get("nodes", []):
+                history = _get_history(repo)
+                if not history:
+                    continue
+                repository_name = f"{repo['owner']['login']}/{repo['name']}"
+                known_head = (known_heads or {}).get(repository_name)
+                page_commits, reached_head = _history_commits(history, repository_name, known_head)
+                commits.extend(page_commits)
+                report(repositories_found=1, commits_found=len(page_commits))
+                if reached_head:
+                    report(repositories_crawled=1)
+                    continue
+                task = asyncio.create_task(
+                    _crawl_repository_history(client, repo, history, variables, semaphore, known_head)
+                )
+                task.add_done_callback(on_history_done)
+                history_tasks.append(task)
+
+            repo_page_info = repositories.get("pageInfo", {})
+            if not repo_page_info.get("hasNextPage"):
+                break
+            repo_cursor = repo_page_info["endCursor"]
+
+        for repository_commits in await asyncio.gather(*history_tasks):
+            commits.extend(repository_commits)
+    finally:
+        for task in history_tasks:
+            task.cancel()
+
+    return commits
 
-    return commit_details
 
 def get_github_access_token(user):
     try:
@@ -151,117 +364,182 @@ def get_github_access_token(user):
         return None
 
 
-def fetch_github_commit_change(commit, headers):
+def get_github_client(user, priority=INTERACTIVE):
+    """
+    Returns a `GitHubClient` for the user's GitHub token, or None when the user has none.
+    """
+    token = get_github_access_token(user)
+    if not token:
+        return None
+    return GitHubClient(token, priority)
+
+
+def fetch_commit_stats(client, commits):
+    """
+    Resolves the stats and committer of many commits with aliased GraphQL `object(oid:)`
+    lookups, `GITHUB_GRAPHQL_BATCH_SIZE` commits per request.
+
+    Args:
+        client (GitHubClient): The client of the token making the requests.
+        commits (iterable): `(repository, sha)` pairs, `repository` being "owner/name".
+
+    Returns:
+        dict: Commit nodes by SHA. Commits that cannot be resolved are left out.
+    """
+    commits = list(dict.fromkeys(commits))
+    batch_size = settings.GITHUB_GRAPHQL_BATCH_SIZE
+    stats = {}
+
+    for offset in range(0, len(commits), batch_size):
+        batch = commits[offset:offset + batch_size]
+        declarations, selections, variables = [], [], {}
+        for index, (repository, sha) in enumerate(batch):
+            owner, name = repository.split("/", 1)
+            declarations.append(f"$owner{index}: String!, $name{index}: String!, $oid{index}: GitObjectID!")
+            selections.append(
+                f"  c{index}: repository(owner: $owner{index}, name: $name{index}) "
+                f"{{ object(oid: $oid{index}) {{ ...commitStats }} }}"
+            )
+            variables.update({f"owner{index}": owner, f"name{index}": name, f"oid{index}": sha})
+
+        query = (
+            f"query({', '.join(declarations)}) {{\n"
+            "  rateLimit {\n    cost\n    remaining\n    resetAt\n  }\n"
+            + "\n".join(selections)
+            + "\n}\n"
+            + COMMIT_STATS_FRAGMENT
+        )
+        payload = client.graphql(query, variables)
+        data = payload.get("data")
+        if data is None:
+            raise GitHubError(str(payload.get("errors")))
+
+        for index in range(len(batch)):
+            node = (data.get(f"c{index}") or {}).get("object")
+            if node:
+                stats[node["oid"]] = node
+
+    return stats
+
+
+def _without_patches(commit_details):
+    # File diffs make up most of a commit payload and are never read
+    return {
+        **commit_details,
+        "files": [
+            {key: value for key, value in file.items() if key != "patch"}
+            for file in commit_details.get("files", [])
+        ],
+    }
+
+
+def fetch_github_commit_change(commit, client):
     """
     Fetches details of a specific commit including file changes.
     """
     url = commit["url"]
-    response = requests.get(url, headers=headers)
+    # Commit details are addressed by SHA and never change once fetched
+    response = cached_get(client, url, immutable=True, compact=_without_patches)
     if response.status_code == 200:
         return response.json()  # Returns commit details
     return None
 
 
-def fetch_github_commits(user):
+def fetch_github_commits(user, priority=INTERACTIVE):
     """
     Fetches GitHub events, filters push events, and syncs commits and file changes.
+
+    Commit stats are resolved in batches through GraphQL. GraphQL has no per-file data, so
+    the REST commit endpoint is only called for the file changes of commits that have none
+    stored yet, and not at all when `GITHUB_SYNC_FILE_CHANGES` is disabled.
     """
-    token = get_github_access_token(user)
-    if not token:
+    client = get_github_client(user, priority)
+    if not client:
         return {"error": "GitHub token not found for this user."}
 
     # Make a request to the GitHub API
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
     url = f"https://api.github.com/users/{user.username}/events?per_page=100"
-    response = requests.get(url, headers=headers)
+    response = cached_get(client, url)
 
     if response.status_code != 200:
         return {"error": f"GitHub API returned status {response.status_code}"}
 
     events = response.json()
 
+    # Only process events newer than the last one read from the feed
+    sync_state, _ = GitHubSyncState.objects.get_or_create(user=user, repo="")
+    last_event_id = int(sync_state.cursor or 0)
+
     # Filter PushEvents (commits)
-    push_events = [event for event in events if event["type"] == "PushEvent"]
-    synced_commits = []
+    push_events = [
+        event for event in events
+        if event["type"] == "PushEvent" and int(event["id"]) > last_event_id
+    ]
 
-    for event in push_events:
-        # Create or get the GitHub event in the database
-        repo_name = event["repo"]["name"]
-        event_instance, _ = GitHubEvent.objects.get_or_create(
-            user=user,
-            date=event["created_at"].split("T")[0],
-            event_type=event["type"],
-            repo=repo_name,
-        )
+    try:
+        commit_stats = fetch_commit_stats(client, [
+            (event["repo"]["name"], commit_data["sha"])
+            for event in push_events
+            for commit_data in event["payload"]["commits"]
+        ])
+    except GitHubError as e:
+        return {"error": f"Failed to fetch commit details. {e}"}
+
+    commits_with_files = set(
+        GithubFileChange.objects.filter(github_commit_id__in=list(commit_stats)).values_list("github_commit_id", flat=True)
+    )
 
+    commits = []
+    file_changes = {}
+    for event in push_events:
         # Process each commit in the event
         for commit_data in event["payload"]["commits"]:
             sha = commit_data["sha"]
-            message = commit_data["message"]
-            url = commit_data["url"]
-            author_data = commit_data.get("author", {})
-
-            # Fetch full commit details
-            commit_details = fetch_github_commit_change(commit_data, headers)
-            if not commit_details:
+            stats = commit_stats.get(sha)
+            if not stats:
                 continue  # Skip if commit details could not be fetched
 
-            # Create or get the GitHub commit in the database
-            commit_instance, _ = GitHubCommit.objects.get_or_create(
-                github_event=event_instance,
-                sha=sha,
-                defaults={
-                    "author": author_data,
-                    "committer": commit_details.get("commit", {}).get("committer", {}),
-                    "date": commit_details.get("commit", {}).get("committer", {}).get("date", "").split("T")[0],
-                    "additions": commit_details.get("stats", {}).get("additions", 0),
-                    "deletions": commit_details.get("stats", {}).get("deletions", 0),
-                    "changes": commit_details.get("stats", {}).get("total", 0),
-                    "message": message,
-                    "url": url,
-                },
-            )
+            commits.append({
+                "oid": sha,
+                "date": parse_date(stats["committedDate"][:10]),
+                "event_date": parse_date(event["created_at"][:10]),
+                "repo": event["repo"]["name"],
+                "event_type": event["type"],
+                "author": commit_data.get("author", {}),
+                "committer": stats.get("committer") or {},
+                "additions": stats["additions"],
+                "deletions": stats["deletions"],
+                "changes": stats["additions"] + stats["deletions"],
+                "message": commit_data["message"],
+                "url": commit_data["url"],
+            })
+
+            if not settings.GITHUB_SYNC_FILE_CHANGES or sha in commits_with_files:
+                continue
+
+            # Fetch the file changes, which only the REST API provides
+            commit_details = fetch_github_commit_change(commit_data, client)
+            if commit_details:
+                file_changes[sha] = commit_details.get("files", [])
 
-            # Process file changes for the commit
-            files = commit_details.get("files", [])
-            try:
-                for file in files:
-                    GithubFileChange.objects.get_or_create(
-                        github_commit=commit_instance,
-                        sha=file.get("sha"),
-                        defaults={
-                            "filename": file.get("filename"),
-                            "status": file.get("status"),
-                            "additions": file.get("additions", 0),
-                            "deletions": file.get("deletions", 0),
-                            "changes": file.get("changes", 0),
-                            "blob_url": file.get("blob_url"),
-                            "raw_url": file.get("raw_url"),
-                            "contents_url": file.get("contents_url"),
-                        },
-                    )
-            except Exception as e:
-                print(e)
-
-            synced_commits.append(commit_instance.sha)
+    synced_commits = ingest_commits(user, commits, file_changes)
+
+    if events:
+        sync_state.cursor = str(max(last_event_id, *(int(event["id"]) for event in events)))
+        sync_state.save()
 
     return {"synced_commits": synced_commits}
 
 
-def fetch_contribution_calendar(user, year=None):
+def fetch_contribution_calendar(user, year=None, priority=INTERACTIVE):
     """
     Fetches the contribution calendar for the user using the GitHub GraphQL API.
     An optional `year` parameter can be passed to filter contributions for a specific year.
     """
-    token = get_github_access_token(user)
-    if not token:
+    client = get_github_client(user, priority)
+    if not client:
         return {"error": "GitHub token not found for this user."}
 
-    headers = {"Authorization": f"Bearer {token}"}
-
     # Default to the current year if no year is provided
     if year is None:
         year = now().year
@@ -273,6 +551,11 @@ def fetch_contribution_calendar(user, year=None):
     # GraphQL query to fetch the contribution calendar
     query = """
     query($username: String!, $start_date: DateTime!, $end_date: DateTime!) {
+      rateLimit {
+        cost
+        remaining
+        resetAt
+      }
       user(login: $username) {
         contributionsCollection(from: $start_date, to: $end_date) {
           contributionCalendar {
@@ -290,13 +573,10 @@ def fetch_contribution_calendar(user, year=None):
     """
     variables = {"username": user.username, "start_date": start_date, "end_date": end_date}
 
-    response = requests.post(
-        GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables}, headers=headers
-    )
-
-    if response.status_code == 200:
-        return response.json()
-    return {"error": "Failed to fetch contribution calendar."}
+    try:
+        return client.graphql(query, variables)
+    except GitHubError:
+        return {"error": "Failed to fetch contribution calendar."}
 
 def calculate_activity_streak(contribution_calendar, daily_goal, today=None):
     """
@@ -325,13 +605,13 @@ def calculate_daily_goal_progress(contribution_calendar, daily_goal):
     """
     Calculates the progress toward the daily goal.
     """
-    today = datetime.now().date()
+    today = datetime.now().date().isoformat()
     today_contributions = next(
         (
             day["contributionCount"]
             for week in contribution_calendar["weeks"]
             for day in week["contributionDays"]
-            if datetime.strptime(day["date"], "%Y-%m-%d").date() == today
+            if day["date"] == today
         ),
         0,
     )
@@ -0,0 +1,102 @@
+"""
+Conditional-request cache for GitHub REST calls.
+
+Response bodies are stored in the default cache together with their ETag. Later requests for
+the same URL send `If-None-Match`, and GitHub answers with an empty 304 that does not count
+against the rate limit. Payloads that can never change, such as commit details addressed by
+SHA, are served straight from the cache without any request for
+`GITHUB_HTTP_IMMUTABLE_CACHE_TIMEOUT` seconds.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+CACHE_ALIAS = "default"
+CACHE_PREFIX = "github-http"
+
+
+class CachedResponse:
+    """Minimal stand-in for `requests.Response` built from a cached body."""
+
+    def __init__(self, data, etag=None):
+        self.status_code = 200
+        self.headers = {"ETag": etag} if etag else {}
+        self.from_cache = True
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def _cache_key(client, url):
+    # The token is part of the key since private events and repositories differ per user
+    digest = hashlib.sha256(f"{client.token_key}|{url}".encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{digest}"
+
+
+def _count(outcome):
+    cache = caches[CACHE_ALIAS]
+    key = f"{CACHE_PREFIX}:stats:{outcome}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def cache_stats():
+    """
+    Returns the number of cache hits (including 304 revalidations) and misses so far.
+    """
+    cache = caches[CACHE_ALIAS]
+    return {
+        outcome: cache.get(f"{CACHE_PREFIX}:stats:{outcome}", 0)
+        for outcome in ("hit", "miss")
+    }
+
+
+def cached_get(client, url, immutable=False, headers=None, compact=None):
+    """
+    Performs a GET request against the GitHub REST API through the cache.
+
+    Args:
+        client (GitHubClient): The client of the token making the request.
+        url (str): The API URL to fetch.
+        immutable (bool): Whether the payload can never change for this URL. Cached
+            immutable payloads are returned without contacting GitHub.
+        headers (dict): Additional request headers.
+        compact (callable): Returns the part of the decoded payload worth caching, the
+            response itself is left untouched.
+
+    Returns:
+        requests.Response | CachedResponse: The live response on a cache miss, or a
+        `CachedResponse` with status 200 when the body came from the cache.
+    """
+    cache = caches[CACHE_ALIAS]
+    key = _cache_key(client, url)
+    entry = cache.get(key)
+
+    if entry and immutable:
+        _count("hit")
+        return CachedResponse(entry["data"], entry.get("etag"))
+
+    request_headers = {"Accept": "application/vnd.github.v3+json", **(headers or {})}
+    if entry and entry.get("etag"):
+        request_headers["If-None-Match"] = entry["etag"]
+
+    response = client.get(url, headers=request_headers)
+
+    if response.status_code == 304 and entry:
+        _count("hit")
+        return CachedResponse(entry["data"], entry.get("etag"))
+
+    _count("miss")
+    etag = response.headers.get("ETag")
+    if response.status_code == 200 and (immutable or etag):
+        data = response.json()
+        cache.set(
+            key,
+            {"etag": etag, "data": compact(data) if compact else data},
+            timeout=settings.GITHUB_HTTP_IMMUTABLE_CACHE_TIMEOUT if immutable else settings.GITHUB_HTTP_CACHE_TIMEOUT,
+        )
+    return response
@@ -0,0 +1,378 @@
+"""
+Central client for the GitHub API.
+
+Every request made with a token first takes its cost from a per-token bucket kept in Redis, so
+all gunicorn and Celery processes share one view of the remaining budget. The bucket is
+reconciled with GitHub after each response from the `X-RateLimit-*` and `Retry-After` headers
+and from the GraphQL `rateLimit` block. Background work stops while the remaining budget is
+inside the reserve kept for interactive requests, and every caller gets a typed
+`GitHubRateLimited` error instead of a GitHub 403.
+
+All traffic goes through one keep-alive session per process (`send_request`), with pooled
+connections, connect/read timeouts and jittered exponential retries on 5xx and secondary rate
+limit answers. With `GITHUB_HTTP2` enabled and `httpx[http2]` installed, requests are
+multiplexed over HTTP/2 instead.
+"""
+import hashlib
+import logging
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+import requests
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+from requests.adapters import HTTPAdapter
+from rest_framework.exceptions import Throttled
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    import h2  # noqa: F401  (required by httpx for HTTP/2)
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Takes `cost` from the bucket unless it would dig into `reserve`. An unknown or expired
+# bucket lets the request through, GitHub's answer then sets the real numbers.
+ACQUIRE_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'remaining', 'reset', 'blocked_until')
+local now = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local blocked_until = tonumber(state[3])
+if blocked_until and now < blocked_until then
+  return {0, blocked_until}
+end
+local remaining = tonumber(state[1])
+local reset = tonumber(state[2])
+if not remaining or not reset or now >= reset then
+  return {1, 0}
+end
+if remaining - cost < reserve then
+  return {0, reset}
+end
+redis.call('HINCRBY', KEYS[1], 'remaining', -cost)
+return {1, reset}
+"""
+
+# Adds a lease expiring at ARGV[3] unless ARGV[2] unexpired leases are already held. Leases of
+# killed workers expire instead of holding their slot forever.
+CONCURRENCY_ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(ARGV[3])))
+return 1
+"""
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+class TimeoutSession(requests.Session):
+    """Session applying default connect/read timeouts to every request."""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def _build_session():
+    timeout = (settings.GITHUB_HTTP_CONNECT_TIMEOUT, settings.GITHUB_HTTP_READ_TIMEOUT)
+    if settings.GITHUB_HTTP2 and httpx is not None:
+        # With an explicit transport the client ignores its own `limits`, they go on the transport
+        return httpx.Client(
+            timeout=httpx.Timeout(timeout[1], connect=timeout[0]),
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=settings.GITHUB_HTTP_MAX_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=settings.GITHUB_HTTP_POOL_SIZE,
+                    max_keepalive_connections=settings.GITHUB_HTTP_POOL_SIZE,
+                ),
+            ),
+        )
+    if settings.GITHUB_HTTP2:
+        logger.warning("GITHUB_HTTP2 is enabled but httpx[http2] is not installed, using HTTP/1.1")
+
+    session = TimeoutSession(timeout)
+    # Connection failures happen before anything is sent, so they are safe to retry for
+    # any method. Status based retries are handled by `send_request`.
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=settings.GITHUB_HTTP_POOL_SIZE,
+        max_retries=Retry(total=None, connect=settings.GITHUB_HTTP_MAX_RETRIES, read=0, status=0, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Returns the HTTP session shared by all GitHub traffic of the current process.
+    Forked workers build their own instead of reusing the parent's sockets.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                _session = _build_session()
+                _session_pid = os.getpid()
+    return _session
+
+
+def _retry_delay(response, attempt):
+    """
+    Returns how long to wait before retrying `response`, or None when it must not be retried.
+    """
+    backoff = min(settings.GITHUB_HTTP_MAX_BACKOFF, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+    if response.status_code >= 500:
+        return backoff
+    if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") != "0":
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            # Long secondary rate limit pauses are left to the caller instead of blocking here
+            return int(retry_after) if int(retry_after) <= settings.GITHUB_HTTP_MAX_BACKOFF else None
+        if "secondary rate limit" in response.text.lower():
+            return backoff
+    return None
+
+
+def send_request(method, url, **kwargs):
+    """
+    Sends a request on the shared session, retrying 5xx and secondary rate limit responses
+    up to `GITHUB_HTTP_MAX_RETRIES` times with jittered exponential backoff.
+    """
+    session = get_session()
+    for attempt in range(settings.GITHUB_HTTP_MAX_RETRIES + 1):
+        response = session.request(method, url, **kwargs)
+        delay = _retry_delay(response, attempt) if attempt < settings.GITHUB_HTTP_MAX_RETRIES else None
+        if delay is None:
+            return response
+        logger.info("Retrying %s %s after status %s in %.1fs", method, url, response.status_code, delay)
+        time.sleep(delay)
+
+
+class GitHubError(Exception):
+    """Raised when GitHub answers a request with an unexpected status."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GitHubRateLimited(Throttled):
+    """
+    Raised when a GitHub request cannot be made before `retry_at` (an aware datetime).
+    Views let DRF turn it into a 429 with a `Retry-After` header, tasks retry at `retry_at`.
+    """
+    default_detail = "GitHub rate limit exhausted."
+
+    def __init__(self, retry_at, resource="core"):
+        self.retry_at = retry_at
+        self.resource = resource
+        super().__init__(
+            wait=max(0, math.ceil(retry_at.timestamp() - time.time())),
+            detail=f"GitHub {resource} rate limit exhausted until {retry_at.isoformat()}.",
+        )
+
+    @property
+    def countdown(self):
+        """Seconds to wait before retrying."""
+        return self.wait or 0
+
+
+class RateLimitBucket:
+    """
+    Per-token view of GitHub's rate limit windows, stored in a Redis hash per resource.
+    """
+
+    def __init__(self, token):
+        self.token_key = hashlib.sha256(token.encode()).hexdigest()[:32]
+
+    def _key(self, resource):
+        return f"github:ratelimit:{self.token_key}:{resource}"
+
+    def acquire(self, resource, cost=1, reserve=0):
+        """
+        Takes `cost` from the bucket or raises `GitHubRateLimited` when it would leave less
+        than `reserve` for other requests.
+        """
+        try:
+            connection = get_redis_connection("default")
+            allowed, retry_at = connection.register_script(ACQUIRE_SCRIPT)(
+                keys=[self._key(resource)], args=[int(time.time()), cost, reserve]
+            )
+        except RedisError as e:
+            logger.warning("GitHub rate limit bucket unavailable, letting request through: %s", e)
+            return
+        if not allowed:
+            raise GitHubRateLimited(datetime.fromtimestamp(int(retry_at), tz=timezone.utc), resource)
+
+    def update(self, resource, remaining=None, reset=None, retry_after=None):
+        """
+        Stores what GitHub reported for the window of `resource`.
+        `reset` is an epoch timestamp, `retry_after` a number of seconds to stay away.
+        """
+        mapping = {}
+        if remaining is not None and reset is not None:
+            mapping.update({"remaining": int(remaining), "reset": int(reset)})
+        if retry_after is not None:
+            mapping["blocked_until"] = int(time.time()) + int(retry_after)
+        if not mapping:
+            return
+        expire_at = max(mapping.get("reset", 0), mapping.get("blocked_until", 0)) + 60
+        try:
+            connection = get_redis_connection("default")
+            pipeline = connection.pipeline()
+            pipeline.hset(self._key(resource), mapping=mapping)
+            pipeline.expireat(self._key(resource), expire_at)
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning("Could not update GitHub rate limit bucket: %s", e)
+
+
+class ConcurrencySlots:
+    """
+    Caps the requests of one token in flight across all processes at `GITHUB_CRAWL_CONCURRENCY`,
+    with a Redis sorted set of leases scored by their expiry.
+    """
+
+    def __init__(self, token_key):
+        self.key = f"github:concurrency:{token_key}"
+
+    @property
+    def lease_seconds(self):
+        # Longest a request can take, retries and their backoff included
+        return (settings.GITHUB_HTTP_READ_TIMEOUT + settings.GITHUB_HTTP_MAX_BACKOFF) * (
+            settings.GITHUB_HTTP_MAX_RETRIES + 1
+        )
+
+    def acquire(self):
+        """
+        Takes a slot and returns its lease, or None when all slots are taken. Without Redis the
+        slot is granted and only the caller's own limit applies.
+        """
+        lease = uuid.uuid4().hex
+        now = time.time()
+        try:
+            connection = get_redis_connection("default")
+            acquired = connection.register_script(CONCURRENCY_ACQUIRE_SCRIPT)(
+                keys=[self.key],
+                args=[now, settings.GITHUB_CRAWL_CONCURRENCY, now + self.lease_seconds, lease],
+            )
+        except RedisError as e:
+            logger.warning("GitHub concurrency slots unavailable, letting request through: %s", e)
+            return lease
+        return lease if acquired else None
+
+    def release(self, lease):
+        try:
+            get_redis_connection("default").zrem(self.key, lease)
+        except RedisError as e:
+            logger.warning("Could not release GitHub concurrency slot: %s", e)
+
+
+class GitHubClient:
+    """
+    Issues GitHub API requests for a single token at the given priority.
+    """
+
+    def __init__(self, token, priority=INTERACTIVE):
+        self.token = token
+        self.priority = priority
+        self.bucket = RateLimitBucket(token)
+        self.concurrency = ConcurrencySlots(self.bucket.token_key)
+
+    @property
+    def token_key(self):
+        return self.bucket.token_key
+
+    @property
+    def reserve(self):
+        if self.priority == BACKGROUND:
+            return settings.GITHUB_RATE_LIMIT_BACKGROUND_RESERVE
+        return 0
+
+    def request(self, method, url, resource="core", headers=None, **kwargs):
+        """
+        Sends a request once the bucket allows it and returns the response.
+        Raises `GitHubRateLimited` when GitHub refused it for rate limiting.
+        """
+        self.bucket.acquire(resource, reserve=self.reserve)
+
+        request_headers = {"Authorization": f"Bearer {self.token}", **(headers or {})}
+        response = send_request(method, url, headers=request_headers, **kwargs)
+
+        resource = response.headers.get("X-RateLimit-Resource", resource)
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        retry_after = response.headers.get("Retry-After")
+        self.bucket.update(
+            resource,
+            remaining=remaining,
+            reset=response.headers.get("X-RateLimit-Reset"),
+            retry_after=retry_after if response.status_code in (403, 429) else None,
+        )
+
+        if response.status_code in (403, 429) and (retry_after or remaining == "0"):
+            if retry_after:
+                retry_at = time.time() + int(retry_after)
+            else:
+                retry_at = int(response.headers.get("X-RateLimit-Reset", time.time() + 60))
+            raise GitHubRateLimited(datetime.fromtimestamp(retry_at, tz=timezone.utc), resource)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def graphql(self, query, variables=None):
+        """
+        Runs a GraphQL query and returns the decoded payload.
+        Queries selecting `rateLimit { cost remaining resetAt }` keep the bucket exact.
+        """
+        response = self.request(
+            "POST",
+            GITHUB_GRAPHQL_URL,
+            resource="graphql",
+            json={"query": query, "variables": variables or {}},
+        )
+        if response.status_code != 200:
+            raise GitHubError(
+                f"GitHub API returned status {response.status_code}: {response.text}",
+                status_code=response.status_code,
+            )
+
+        payload = response.json()
+        rate_limit = (payload.get("data") or {}).get("rateLimit")
+        if rate_limit:
+            reset_at = parse_datetime(rate_limit["resetAt"])
+            self.bucket.update("graphql", remaining=rate_limit["remaining"], reset=reset_at.timestamp())
+
+        if any(error.get("type") == "RATE_LIMITED" for error in payload.get("errors", [])):
+            reset_at = parse_datetime(rate_limit["resetAt"]) if rate_limit else None
+            raise GitHubRateLimited(
+                reset_at or datetime.fromtimestamp(time.time() + 60, tz=timezone.utc), "graphql"
+            )
+        return payload
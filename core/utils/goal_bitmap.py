@@ -0,0 +1,60 @@
+"""
+Bitsets of the days a daily goal was met.
+
+Bit `i` (least significant bit first within each byte) records whether the goal was met on
+the `i`-th day after the anchor date. Streaks and counts are computed on the bitset as a whole
+with integer bit operations instead of replaying the days.
+"""
+
+
+def set_day(bitmap, index, met):
+    """
+    Returns `bitmap` with the bit of day `index` set to `met`, growing it as needed.
+    """
+    bitmap = bytearray(bitmap or b"")
+    byte, bit = divmod(index, 8)
+    if byte >= len(bitmap):
+        if not met:
+            return bytes(bitmap)
+        bitmap.extend(b"\x00" * (byte + 1 - len(bitmap)))
+    if met:
+        bitmap[byte] |= 1 << bit
+    else:
+        bitmap[byte] &= ~(1 << bit) & 0xFF
+    return bytes(bitmap)
+
+
+def from_days(indexes):
+    """
+    Builds the bitmap with the bits of the given day indexes set.
+    """
+    value = 0
+    for index in indexes:
+        value |= 1 << index
+    return value.to_bytes((value.bit_length() + 7) // 8, "little")
+
+
+def _as_int(bitmap, days):
+    return int.from_bytes(bytes(bitmap or b""), "little") & ((1 << days) - 1)
+
+
+def active_days(bitmap, days):
+    """Number of days the goal was met among the first `days` days."""
+    return bin(_as_int(bitmap, days)).count("1")
+
+
+def current_streak(bitmap, days):
+    """Length of the run of met days ending on day `days - 1`."""
+    missed = ~_as_int(bitmap, days) & ((1 << days) - 1)
+    return days - missed.bit_length()
+
+
+def longest_streak(bitmap, days):
+    """Length of the longest run of met days among the first `days` days."""
+    value = _as_int(bitmap, days)
+    longest = 0
+    # Each step shortens every run by one, the number of steps is the longest run
+    while value:
+        value &= value >> 1
+        longest += 1
+    return longest
@@ -0,0 +1,146 @@
+"""
+Bulk ingestion of GitHub commits and file changes.
+
+All the events a batch needs are resolved with one query, then commits and file changes are
+upserted with `bulk_create(update_conflicts=True)` in chunks of `GITHUB_INGEST_CHUNK_SIZE`
+rows, the whole batch inside a single transaction. The user's `DailyActivity` rollup is
+rebuilt for every day the batch touched in the same transaction, and the changed totals of
+days that challenge progress already folded are applied to its running state. Commits taken
+over from another user are removed from that user's rollup and progress the same way. Cached
+activity streaks of the affected users are invalidated once the transaction commits.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from core.models.github_activity import DailyActivity, GitHubEvent, GitHubCommit, GithubFileChange
+from core.models.user_challenge import UserChallenge
+from core.utils.streaks import invalidate_activity_streaks
+
+COMMIT_FIELDS = ["author", "committer", "date", "additions", "deletions", "changes", "message", "url"]
+FILE_CHANGE_FIELDS = ["sha", "status", "additions", "deletions", "changes", "blob_url", "raw_url", "contents_url"]
+
+
+def _chunks(rows, size):
+    for offset in range(0, len(rows), size):
+        yield rows[offset:offset + size]
+
+
+def _resolve_events(user, keys):
+    """
+    Returns the user's events by `(date, repo, event_type)`, creating the missing ones.
+    """
+    events = {}
+    existing = GitHubEvent.objects.filter(
+        user=user, date__in={date for date, _, _ in keys}
+    ).order_by("id")
+    for event in existing:
+        events.setdefault((event.date, event.repo, event.event_type), event)
+
+    missing = [
+        GitHubEvent(user=user, date=date, repo=repo, event_type=event_type)
+        for date, repo, event_type in keys
+        if (date, repo, event_type) not in events
+    ]
+    if missing:
+        for event in GitHubEvent.objects.bulk_create(missing):
+            events[(event.date, event.repo, event.event_type)] = event
+    return events
+
+
+def ingest_commits(user, commits, file_changes=None):
+    """
+    Upserts the user's commits, keyed on `oid`, and their file changes, keyed on
+    `(github_commit, filename)`.
+
+    Args:
+        user (User): The owner of the commits.
+        commits (list[dict]): Commit rows with an `oid`, a `date` (datetime.date), the `repo`
+            and `event_type` of the event they belong to, and any of `COMMIT_FIELDS`. The
+            event is dated by `event_date` when given, else by `date`. Only the fields
+            present in every row are overwritten on existing commits.
+        file_changes (dict): Lists of file change rows (GitHub REST `files` entries) by oid.
+
+    Returns:
+        list: The oids of the ingested commits.
+    """
+    file_changes = file_changes or {}
+    chunk_size = settings.GITHUB_INGEST_CHUNK_SIZE
+    # An upsert cannot touch the same row twice, the last row of a duplicated oid wins
+    commits = list({commit["oid"]: commit for commit in commits}.values())
+    if not commits:
+        return []
+
+    update_fields = ["github_event", "user", "repo"] + [
+        field for field in COMMIT_FIELDS if all(field in commit for commit in commits)
+    ]
+
+    def event_key(commit):
+        return (commit.get("event_date", commit["date"]), commit.get("repo", ""), commit.get("event_type", "commit"))
+
+    with transaction.atomic():
+        events = _resolve_events(user, {event_key(commit) for commit in commits})
+
+        # Days the commits are on now and, for commits being updated, the days they were on,
+        # by owner when another user stored them first
+        touched_dates = {commit["date"] for commit in commits if "date" in commit}
+        previous_owners = {}
+        for chunk in _chunks([commit["oid"] for commit in commits], chunk_size):
+            for owner_id, date in GitHubCommit.objects.filter(oid__in=chunk).values_list("user_id", "date"):
+                if owner_id == user.pk:
+                    touched_dates.add(date)
+                else:
+                    previous_owners.setdefault(owner_id, set()).add(date)
+
+        rows = [
+            GitHubCommit(
+                oid=commit["oid"],
+                github_event=events[event_key(commit)],
+                user=user,
+                repo=commit.get("repo", ""),
+                **{field: commit[field] for field in COMMIT_FIELDS if field in commit},
+            )
+            for commit in commits
+        ]
+        for chunk in _chunks(rows, chunk_size):
+            GitHubCommit.objects.bulk_create(
+                chunk,
+                update_conflicts=True,
+                unique_fields=["oid"],
+                update_fields=update_fields,
+            )
+
+        file_rows = {
+            (oid, file.get("filename")): GithubFileChange(
+                github_commit_id=oid,
+                filename=file.get("filename"),
+                sha=file.get("sha") or "",
+                status=file.get("status") or "",
+                additions=file.get("additions", 0),
+                deletions=file.get("deletions", 0),
+                changes=file.get("changes", 0),
+                blob_url=file.get("blob_url") or "",
+                raw_url=file.get("raw_url") or "",
+                contents_url=file.get("contents_url") or "",
+            )
+            for oid, files in file_changes.items()
+            for file in files
+        }
+        for chunk in _chunks(list(file_rows.values()), chunk_size):
+            GithubFileChange.objects.bulk_create(
+                chunk,
+                update_conflicts=True,
+                unique_fields=["github_commit", "filename"],
+                update_fields=FILE_CHANGE_FIELDS,
+            )
+
+        owners = [(user, touched_dates)] + [
+            (owner, previous_owners[owner.pk]) for owner in User.objects.filter(pk__in=previous_owners)
+        ]
+        for owner, dates in owners:
+            changes = DailyActivity.rebuild(owner, dates)
+            UserChallenge.apply_activity_changes(owner, changes)
+            if changes:
+                transaction.on_commit(lambda owner_id=owner.pk: invalidate_activity_streaks(owner_id))
+
+    return [commit["oid"] for commit in commits]
@@ -0,0 +1,149 @@
+"""
+Challenge leaderboards kept in Redis sorted sets.
+
+Each challenge has one ZSET of member user ids scored by `score(progress, highest_streak)`, so
+members rank by progress first and by their highest streak on ties. Progress writers publish
+the new scores once their transaction commits, pages, ranks and "around me" windows are then
+O(log n) reads and the database is only queried to hydrate the rows shown. A missing set, for
+instance after a Redis flush, is rebuilt from the database on first read.
+"""
+import logging
+
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "leaderboard"
+
+# Streaks are bounded by the days of a challenge, far below this factor
+STREAK_FACTOR = 1_000_000
+
+
+def _key(challenge_id):
+    return f"{KEY_PREFIX}:{challenge_id}"
+
+
+def score(progress, highest_streak):
+    # Truncated like the integer `progress` column, the rebuild from the database must agree
+    return int(progress) * STREAK_FACTOR + highest_streak
+
+
+def _publish(scores, removed):
+    try:
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        for challenge_id, members in scores.items():
+            pipeline.zadd(_key(challenge_id), members)
+        for challenge_id, user_ids in removed.items():
+            pipeline.zrem(_key(challenge_id), *user_ids)
+        pipeline.execute()
+    except RedisError as e:
+        logger.warning("Could not update challenge leaderboards: %s", e)
+
+
+def update_scores(user_challenges):
+    """
+    Publishes the scores of the given `UserChallenge` rows after the current transaction commits.
+    """
+    scores = {}
+    for user_challenge in user_challenges:
+        scores.setdefault(user_challenge.challenge_id, {})[user_challenge.user_id] = score(
+            user_challenge.progress, user_challenge.highest_streak
+        )
+    if scores:
+        transaction.on_commit(lambda: _publish(scores, {}))
+
+
+def remove_members(challenge_id, user_ids):
+    """
+    Removes users from the challenge's leaderboard after the current transaction commits.
+    """
+    if user_ids:
+        transaction.on_commit(lambda: _publish({}, {challenge_id: list(user_ids)}))
+
+
+def drop(challenge_id):
+    """
+    Deletes the challenge's leaderboard, the next read rebuilds it.
+    """
+    try:
+        get_redis_connection("default").delete(_key(challenge_id))
+    except RedisError as e:
+        logger.warning("Could not drop leaderboard of challenge %s: %s", challenge_id, e)
+
+
+class Leaderboard:
+    """
+    Ranked members of one challenge, best first.
+
+    Supports `count()` and slicing so it can be handed to a paginator in place of a queryset.
+    Slices return hydrated `UserChallenge` rows. Redis failures raise `RedisError`.
+    """
+
+    def __init__(self, challenge):
+        self.challenge = challenge
+        self.key = _key(challenge.pk)
+        self.redis = get_redis_connection("default")
+
+    def _members(self):
+        return self.challenge.userchallenge_set.all()
+
+    def ensure(self):
+        """Rebuilds the set from the database when it is missing."""
+        if self.redis.exists(self.key):
+            return
+        members = {
+            user_id: score(progress, highest_streak)
+            for user_id, progress, highest_streak in self._members().values_list(
+                "user_id", "progress", "highest_streak"
+            )
+        }
+        if members:
+            pipeline = self.redis.pipeline()
+            pipeline.delete(self.key)
+            pipeline.zadd(self.key, members)
+            pipeline.execute()
+
+    def count(self):
+        self.ensure()
+        return self.redis.zcard(self.key)
+
+    def hydrate(self, user_ids):
+        """Returns the members' `UserChallenge` rows in `user_ids` order."""
+        rows = {
+            user_challenge.user_id: user_challenge
+            for user_challenge in self._members().filter(user_id__in=user_ids).select_related("user", "challenge")
+        }
+        missing = [user_id for user_id in user_ids if user_id not in rows]
+        if missing:
+            # Members deleted without going through the leaderboard, e.g. with their user
+            self.redis.zrem(self.key, *missing)
+        return [rows[user_id] for user_id in user_ids if user_id in rows]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step:
+            raise TypeError("Leaderboard only supports slicing")
+        self.ensure()
+        start = index.start or 0
+        stop = -1 if index.stop is None else index.stop - 1
+        if index.stop is not None and stop < start:
+            return []
+        return self.hydrate([int(user_id) for user_id in self.redis.zrevrange(self.key, start, stop)])
+
+    def rank(self, user_id):
+        """Returns the 1-based rank of the user, or None when they are not a member."""
+        self.ensure()
+        rank = self.redis.zrevrank(self.key, user_id)
+        return None if rank is None else rank + 1
+
+    def around(self, user_id, radius):
+        """
+        Returns the rank of the first row and the rows of up to `radius` members ranked
+        directly above and below the user, the user included, or None when they are not a member.
+        """
+        rank = self.rank(user_id)
+        if rank is None:
+            return None
+        first = max(0, rank - 1 - radius)
+        return first + 1, self[first:rank + radius]
@@ -0,0 +1,271 @@
+"""
+Challenge progress engines.
+
+`update_challenges_progress` evaluates all of a user's challenges against one read of their
+`DailyActivity` rows and writes them back with a single `bulk_update` of the fields that
+changed. `recompute_challenge_progress` rebuilds the running state of every member of one
+challenge at once, with the streaks computed by a gaps-and-islands query.
+
+Both lock the rows they rewrite, ingestion increments `accumulated_total` concurrently.
+"""
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from core.models.github_activity import DailyActivity
+from core.models.user_challenge import ProgressSnapshot, UserChallenge
+from core.utils import goal_bitmap as bitmaps
+from core.utils import leaderboard
+
+# Days are numbered so that consecutive days differ by one, consecutive days meeting the goal
+# then share the same `day_number - row_number` island key
+DAY_NUMBER_SQL = {
+    "postgresql": "(d.date - DATE '2000-01-01')",
+    "sqlite": "CAST(julianday(d.date) AS INTEGER)",
+}
+
+# One row per member: the metric summed over the challenge window, the longest streak, the
+# streak ending on the last finished day and the metric of today.
+MEMBER_STREAKS_SQL = """
+WITH days AS (
+    SELECT uc.id AS user_challenge_id, d.date, d.{metric} AS metric, {day_number} AS day_number
+    FROM core_userchallenge uc
+    JOIN core_dailyactivity d ON d.user_id = uc.user_id
+    WHERE uc.challenge_id = %(challenge_id)s AND d.date >= %(first_day)s AND d.date <= %(final_day)s
+),
+met AS (
+    SELECT user_challenge_id, date,
+           day_number - ROW_NUMBER() OVER (PARTITION BY user_challenge_id ORDER BY date) AS island
+    FROM days
+    WHERE metric >= %(frequency)s
+),
+islands AS (
+    SELECT user_challenge_id, COUNT(*) AS length, MAX(date) AS last_day
+    FROM met
+    GROUP BY user_challenge_id, island
+),
+streaks AS (
+    SELECT user_challenge_id,
+           MAX(length) AS highest_streak,
+           MAX(CASE WHEN last_day = %(final_day)s THEN length ELSE 0 END) AS current_streak
+    FROM islands
+    GROUP BY user_challenge_id
+),
+totals AS (
+    SELECT uc.id AS user_challenge_id, SUM(d.{metric}) AS total
+    FROM core_userchallenge uc
+    JOIN core_dailyactivity d ON d.user_id = uc.user_id
+    WHERE uc.challenge_id = %(challenge_id)s AND d.date >= %(first_day)s AND d.date <= %(window_end)s
+    GROUP BY uc.id
+)
+SELECT uc.id,
+       COALESCE(t.total, 0),
+       COALESCE(s.highest_streak, 0),
+       COALESCE(s.current_streak, 0),
+       COALESCE(today.{metric}, 0)
+FROM core_userchallenge uc
+LEFT JOIN totals t ON t.user_challenge_id = uc.id
+LEFT JOIN streaks s ON s.user_challenge_id = uc.id
+LEFT JOIN core_dailyactivity today ON today.user_id = uc.user_id AND today.date = %(today)s
+WHERE uc.challenge_id = %(challenge_id)s
+"""
+
+
+def _progress_values(user_challenge):
+    return {
+        field: user_challenge._meta.get_field(field).get_prep_value(getattr(user_challenge, field))
+        for field in UserChallenge.PROGRESS_FIELDS
+    }
+
+
+def update_challenges_progress(user_id, today=None):
+    """
+    Advances the progress of every running challenge of the user.
+
+    Args:
+        user_id (int): The user whose challenges are updated.
+        today (date): The current day, defaults to today.
+
+    Returns:
+        dict: The number of challenges evaluated and updated.
+    """
+    today = today or now().date()
+    with transaction.atomic():
+        return _update_challenges_progress(user_id, today)
+
+
+def _update_challenges_progress(user_id, today):
+    user_challenges = [
+        user_challenge
+        for user_challenge in UserChallenge.objects.select_for_update(of=("self",))
+        .filter(user_id=user_id)
+        .select_related("challenge")
+        if not (user_challenge.challenge.end_date and today > user_challenge.challenge.end_date)
+    ]
+    if not user_challenges:
+        return {"evaluated": 0, "updated": 0}
+
+    before = {user_challenge.pk: _progress_values(user_challenge) for user_challenge in user_challenges}
+    windows = {user_challenge.pk: user_challenge.progress_window(today) for user_challenge in user_challenges}
+    activity = {
+        row["date"]: row
+        for row in DailyActivity.objects.filter(
+            user_id=user_id,
+            date__gte=min(first_day for first_day, _ in windows.values()),
+            date__lte=max(last_day for _, last_day in windows.values()),
+        ).values("date", "commits", "changes")
+    }
+
+    changed, changed_fields = [], set()
+    for user_challenge in user_challenges:
+        user_challenge.apply_progress(activity, today, *windows[user_challenge.pk])
+        after = _progress_values(user_challenge)
+        fields = {field for field in after if after[field] != before[user_challenge.pk][field]}
+        if fields:
+            changed.append(user_challenge)
+            changed_fields |= fields
+
+    if changed:
+        UserChallenge.objects.bulk_update(changed, sorted(changed_fields))
+        leaderboard.update_scores(changed)
+    ProgressSnapshot.record(
+        [user_challenge for user_challenge in user_challenges if user_challenge.challenge.commitment_by == "accumulate"],
+        today,
+    )
+    return {"evaluated": len(user_challenges), "updated": len(changed)}
+
+
+def _member_streaks_sql(challenge, first_day, final_day, today, window_end):
+    metric = "commits" if challenge.type == "commits" else "changes"
+    query = MEMBER_STREAKS_SQL.format(metric=metric, day_number=DAY_NUMBER_SQL[connection.vendor])
+    with connection.cursor() as cursor:
+        cursor.execute(query, {
+            "challenge_id": challenge.pk,
+            "first_day": first_day,
+            "final_day": final_day,
+            "frequency": challenge.frequency,
+            "today": today,
+            "window_end": window_end,
+        })
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+
+def _member_streaks_python(challenge, first_day, final_day, today, window_end):
+    metric = "commits" if challenge.type == "commits" else "changes"
+    members = dict(UserChallenge.objects.filter(challenge=challenge).values_list("user_id", "pk"))
+    rows = DailyActivity.objects.filter(
+        user_id__in=members, date__gte=first_day, date__lte=window_end
+    ).order_by("user_id", "date").values_list("user_id", "date", metric)
+
+    state = {pk: [0, 0, 0, 0, None] for pk in members.values()}  # total, highest, current, today, last met
+    for user_id, day, value in rows:
+        member = state[members[user_id]]
+        member[0] += value
+        if day > final_day:
+            member[3] = value if day == today else member[3]
+            continue
+        if value >= challenge.frequency:
+            member[2] = member[2] + 1 if member[4] == day - timedelta(days=1) else 1
+            member[4] = day
+            member[1] = max(member[1], member[2])
+    for member in state.values():
+        if member[4] != final_day:
+            member[2] = 0
+    return {pk: tuple(member[:4]) for pk, member in state.items()}
+
+
+def _member_met_days(challenge, user_challenges, first_day, final_day):
+    """
+    Returns the indexes of the finished days each member met the daily goal on, by member.
+    """
+    if challenge.commitment_by != "daily":
+        return {}
+    days = (final_day - first_day).days + 1
+    if challenge.frequency == 0:
+        return {user_challenge.pk: range(days) for user_challenge in user_challenges}
+
+    metric = "commits" if challenge.type == "commits" else "changes"
+    members = {user_challenge.user_id: user_challenge.pk for user_challenge in user_challenges}
+    met_days = {}
+    rows = DailyActivity.objects.filter(
+        user_id__in=UserChallenge.objects.filter(challenge=challenge).values("user_id"),
+        date__gte=first_day,
+        date__lte=final_day,
+        **{f"{metric}__gte": challenge.frequency},
+    ).values_list("user_id", "date")
+    for user_id, day in rows.iterator():
+        if user_id in members:  # Skips members who joined after the challenge was loaded
+            met_days.setdefault(members[user_id], []).append((day - first_day).days)
+    return met_days
+
+
+def recompute_challenge_progress(challenge, today=None):
+    """
+    Rebuilds the running progress state of every member of `challenge` from their daily
+    activity, then writes it back with one `bulk_update`. Used when the challenge rules change.
+
+    Returns:
+        int: The number of members updated.
+    """
+    today = today or now().date()
+    if challenge.end_date and today > challenge.end_date:
+        return 0
+
+    first_day = challenge.start_date
+    final_day = min(today - timedelta(days=1), challenge.end_date or today)
+    if final_day < first_day:
+        # Nothing finished yet, the members are rebuilt on their next incremental update
+        return UserChallenge.objects.filter(challenge=challenge).update(last_processed_date=None)
+
+    with transaction.atomic():
+        return _recompute_challenge_progress(challenge, today, first_day, final_day)
+
+
+def _recompute_challenge_progress(challenge, today, first_day, final_day):
+    # Locked first so that no ingestion lands between reading the totals and writing them
+    user_challenges = list(
+        UserChallenge.objects.select_for_update().filter(challenge=challenge).only("pk", "user_id", "challenge_id")
+    )
+    window_end = challenge.end_date or date.max
+    if connection.vendor in DAY_NUMBER_SQL and connection.features.supports_over_clause:
+        streaks = _member_streaks_sql(challenge, first_day, final_day, today, window_end)
+    else:
+        streaks = _member_streaks_python(challenge, first_day, final_day, today, window_end)
+
+    if challenge.commitment_by == "daily" and challenge.frequency == 0:
+        # Days without activity have no row but meet a zero goal as well
+        days = (final_day - first_day).days + 1
+        streaks = {pk: (total, days, days, today_value) for pk, (total, _, _, today_value) in streaks.items()}
+
+    challenge_span = ((challenge.end_date or today) - challenge.start_date).days + 1
+    rules = challenge.rules_digest
+    met_days = _member_met_days(challenge, user_challenges, first_day, final_day)
+    for user_challenge in user_challenges:
+        total, highest_streak, current_streak, today_value = streaks[user_challenge.pk]
+        user_challenge.accumulated_total = total
+        user_challenge.current_streak = current_streak if challenge.commitment_by == "daily" else 0
+        user_challenge.last_processed_date = final_day
+        user_challenge.progress_rules = rules
+        if challenge.commitment_by == "daily":
+            streak = current_streak + (1 if today_value >= challenge.frequency else 0)
+            user_challenge.highest_streak = max(highest_streak, streak)
+            user_challenge.goal_bitmap = bitmaps.from_days(met_days.get(user_challenge.pk, ()))
+            user_challenge.progress = min(100, (streak / challenge_span) * 100)
+        else:
+            user_challenge.highest_streak = 0
+            user_challenge.goal_bitmap = b""
+            user_challenge.progress = min(100, (total / challenge.target_value) * 100)
+
+    UserChallenge.objects.bulk_update(
+        user_challenges,
+        [
+            "progress", "highest_streak", "current_streak", "accumulated_total",
+            "last_processed_date", "progress_rules", "goal_bitmap",
+        ],
+        batch_size=1000,
+    )
+    leaderboard.update_scores(user_challenges)
+    if challenge.commitment_by == "accumulate":
+        ProgressSnapshot.record(user_challenges, today)
+    return len(user_challenges)
@@ -0,0 +1,85 @@
+"""
+Activity streaks computed from the locally stored `DailyActivity` rollup.
+
+Streaks are not bounded by calendar years and need no GitHub request. Results are cached per
+user, range and goal under a generation stamp that ingestion bumps whenever the user's daily
+totals change, so the next request recomputes them from one query.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from core.models.github_activity import DailyActivity
+
+CACHE_PREFIX = "activity-streak"
+
+
+def _generation_key(user_id):
+    return f"{CACHE_PREFIX}:{user_id}:generation"
+
+
+def _generation(user_id):
+    return cache.get_or_set(_generation_key(user_id), time.time_ns, timeout=None)
+
+
+def invalidate_activity_streaks(user_id):
+    """
+    Drops every cached streak of the user.
+    """
+    cache.set(_generation_key(user_id), time.time_ns(), timeout=None)
+
+
+def compute_activity_streaks(user_id, daily_goal=1, start_date=None, end_date=None, today=None):
+    """
+    Computes the current and longest streak of days with at least `daily_goal` commits.
+
+    Args:
+        user_id (int): The user whose activity is read.
+        daily_goal (int): Commits a day needs to count towards a streak, at least 1.
+        start_date (date): First day considered, defaults to the first stored day.
+        end_date (date): Last day considered, defaults to and is capped at today.
+        today (date): The current day, defaults to today.
+
+    Returns:
+        dict: The `current_streak`, ending on `end_date`, and the `longest_streak`. When the
+        range ends today, a streak ending yesterday is still current since today can
+        still meet the goal.
+    """
+    today = today or now().date()
+    end_date = min(end_date or today, today)
+    days = DailyActivity.objects.filter(user_id=user_id, commits__gte=daily_goal, date__lte=end_date)
+    if start_date:
+        days = days.filter(date__gte=start_date)
+
+    run = longest = 0
+    last_day = None
+    for day in days.order_by("date").values_list("date", flat=True).iterator():
+        run = run + 1 if last_day == day - timedelta(days=1) else 1
+        longest = max(longest, run)
+        last_day = day
+
+    current = 0
+    if last_day == end_date or (end_date == today and last_day == today - timedelta(days=1)):
+        current = run
+    return {"current_streak": current, "longest_streak": longest}
+
+
+def get_activity_streaks(user_id, daily_goal=1, start_date=None, end_date=None):
+    """
+    Returns `compute_activity_streaks` for the user, from the cache when the user's activity
+    did not change since it was computed.
+    """
+    today = now().date()
+    key = ":".join(
+        str(part) for part in (
+            CACHE_PREFIX, user_id, _generation(user_id), today, daily_goal, start_date, end_date,
+        )
+    )
+    streaks = cache.get(key)
+    if streaks is None:
+        streaks = compute_activity_streaks(user_id, daily_goal, start_date, end_date, today)
+        cache.set(key, streaks, timeout=settings.ACTIVITY_STREAK_CACHE_TIMEOUT)
+    return streaks
@@ -12,6 +12,12 @@ from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
 from core.models.user_challenge import UserChallenge
+from core.tasks.sync_challenges import recompute_challenge
+from core.utils.leaderboard import Leaderboard
+from redis.exceptions import RedisError
+import logging
+
+logger = logging.getLogger(__name__)
 
 class ChallengeViewSet(MemberManagementMixin, viewsets.ModelViewSet):
     queryset = Challenge.objects.all()
@@ -19,24 +25,79 @@ class ChallengeViewSet(MemberManagementMixin, viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_class = ChallengeFilter
 
+    def perform_update(self, serializer):
+        rules = serializer.instance.rules_digest
+        challenge = serializer.save()
+        # Members are recomputed in one pass instead of one by one on their next sync
+        if challenge.rules_digest != rules:
+            recompute_challenge.delay(challenge.id)
+
     @action(detail=True, methods=['get'])
     def users(self, request, pk=None):
         challenge = get_object_or_404(Challenge, pk=pk)
-        
-        # Query UserChallenge directly
-        user_challenges = UserChallenge.objects.filter(
-            challenge=challenge
-        ).select_related(
-            'user'
-        ).order_by(
-            '-progress',
-            '-highest_streak'
-        )
 
         # Pagination
         paginator = PageNumberPagination()
         paginator.page_size = 10
-        result_page = paginator.paginate_queryset(user_challenges, request)
-        
-        serializer = ChallengeUserSerializer(result_page, many=True)
-        return paginator.get_paginated_response(serializer.data)
\ No newline at end of file
+        try:
+            # Ranked in Redis, only the page shown is read from the database
+            result_page = paginator.paginate_queryset(Leaderboard(challenge), request)
+        except RedisError as e:
+            logger.warning("Leaderboard of challenge %s unavailable, ranking in the database: %s", challenge.pk, e)
+            user_challenges = UserChallenge.objects.filter(
+                challenge=challenge
+            ).select_related(
+                'user', 'challenge'
+            ).order_by(
+                '-progress',
+                '-highest_streak'
+            )
+            result_page = paginator.paginate_queryset(user_challenges, request)
+
+        serializer = ChallengeUserSerializer(result_page, many=True, context={"request": request})
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='users/me')
+    def my_rank(self, request, pk=None):
+        """
+        Returns the current user's rank in the challenge and the number of members.
+        """
+        challenge = get_object_or_404(Challenge, pk=pk)
+        try:
+            leaderboard = Leaderboard(challenge)
+            rank = leaderboard.rank(request.user.id)
+            count = leaderboard.count()
+        except RedisError as e:
+            logger.warning("Leaderboard of challenge %s unavailable: %s", challenge.pk, e)
+            return Response({'error': 'Leaderboard temporarily unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if rank is None:
+            return Response({'error': 'You are not a member of this challenge'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'rank': rank, 'count': count})
+
+    @action(detail=True, methods=['get'], url_path='users/around-me')
+    def around_me(self, request, pk=None):
+        """
+        Returns the members ranked around the current user.
+        Query parameters:
+          - `radius`: Members shown above and below the user (integer, default: 5, at most 50).
+        """
+        challenge = get_object_or_404(Challenge, pk=pk)
+        try:
+            radius = min(max(int(request.query_params.get('radius', 5)), 0), 50)
+        except ValueError:
+            return Response({'error': 'Invalid radius.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            window = Leaderboard(challenge).around(request.user.id, radius)
+        except RedisError as e:
+            logger.warning("Leaderboard of challenge %s unavailable: %s", challenge.pk, e)
+            return Response({'error': 'Leaderboard temporarily unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        if window is None:
+            return Response({'error': 'You are not a member of this challenge'}, status=status.HTTP_404_NOT_FOUND)
+        first_rank, user_challenges = window
+        serializer = ChallengeUserSerializer(user_challenges, many=True, context={"request": request})
+        return Response({
+            'results': [
+                {'rank': rank, **data} for rank, data in enumerate(serializer.data, start=first_rank)
+            ],
+        })
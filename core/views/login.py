@@ -7,15 +7,18 @@ from dj_rest_auth.registration.views import SocialLoginView
 from rest_framework.permissions import AllowAny
 from django.conf import settings
 from allauth.socialaccount.models import SocialAccount, SocialToken
-import requests
 from django.conf import settings
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, update_last_login
+from django.db.models import Q
+from django.utils.timezone import now
+from datetime import timedelta
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
 from rest_framework import status
 from ..serializers.user import RefreshTokenSerializer
+from ..utils.github_client import send_request
 
 
 # View for GitHub OAuth callback (no change needed)
@@ -40,7 +43,7 @@ def github_callback(request):
     }
     headers = {"Accept": "application/json"}
 
-    token_response = requests.post(token_url, data=payload, headers=headers)
+    token_response = send_request("POST", token_url, data=payload, headers=headers)
     if token_response.status_code != 200:
         return Response({"error": "Failed to fetch access token"}, status=400)
 
@@ -48,7 +51,7 @@ def github_callback(request):
     # Step 2: Use the access token to fetch GitHub user info
     user_info_url = "https://api.github.com/user"
     user_info_headers = {"Authorization": f"Bearer {access_token}"}
-    user_info_response = requests.get(user_info_url, headers=user_info_headers)
+    user_info_response = send_request("GET", user_info_url, headers=user_info_headers)
 
     if user_info_response.status_code != 200:
         return Response({"error": "Failed to fetch user info"}, status=400)
@@ -65,6 +68,7 @@ def github_callback(request):
 
     # Step 4: Generate JWT tokens (access and refresh tokens)
     refresh = RefreshToken.for_user(user)
+    update_last_login(None, user)
     tokens = {
         "refresh": str(refresh),
         "access": str(refresh.access_token),
@@ -114,6 +118,11 @@ class RefreshTokenView(APIView):
                 refresh = RefreshToken(refresh_token)
                 new_access_token = str(refresh.access_token)
 
+                # Refreshes mark the user as active for the periodic sync, at most once an hour
+                User.objects.filter(id=refresh["user_id"]).filter(
+                    Q(last_login__isnull=True) | Q(last_login__lt=now() - timedelta(hours=1))
+                ).update(last_login=now())
+
                 return Response({
                     "refresh": refresh_token,
                     "access": new_access_token
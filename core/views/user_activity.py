@@ -2,40 +2,124 @@
 
 from rest_framework import viewsets
 from rest_framework.viewsets import ReadOnlyModelViewSet
-from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange
+from core.models.github_activity import GitHubEvent, GitHubCommit, GithubFileChange, GitHubSyncJob
+from core.pagination import KeysetPagination
+from core.filters.github_activity import GitHubEventFilter, GitHubCommitFilter, GithubFileChangeFilter
 from core.serializers.github_activity import GitHubEventSerializer, GitHubCommitSerializer, GithubFileChangeSerializer
-from core.tasks.sync_challenges import update_user_challenges
-from core.tasks.sync_commit_data import update_github_commits
-from core.utils.github import fetch_commits_with_changes, fetch_github_commits, fetch_contribution_calendar, calculate_activity_streak, calculate_daily_goal_progress
+from core.tasks.sync_commit_data import update_github_commits, crawl_commits_with_changes, get_sync_window
+from core.utils.contribution_calendar import get_contribution_calendar
+from core.utils.streaks import get_activity_streaks
+from core.utils.github import fetch_commits_with_changes, include_stored_commits, initialize_commit_details, fetch_github_commits, calculate_daily_goal_progress
+from django.conf import settings
+from django.core.cache import cache
 from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
-from django.db.models import Count, Sum, F
+from rest_framework.reverse import reverse
+from rest_framework import status
+from django.db.models import Count, Sum, F, Prefetch
 from django.utils.timezone import now
-from django.utils import timezone
 from datetime import timedelta, date, datetime
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
-class GitHubEventViewSet(viewsets.ReadOnlyModelViewSet):
+EXPAND_PARAMETER = OpenApiParameter(
+    name="expand",
+    description="Comma separated relations to include. `files` adds the file changes of each commit.",
+    required=False,
+    type=str,
+    location=OpenApiParameter.QUERY,
+)
+
+# Projections and orders of the prefetched relations, limited to what the serializers read
+COMMIT_PREFETCH_FIELDS = ["oid", "github_event", "author", "message", "url"]
+FILE_CHANGE_PREFETCH_FIELDS = [
+    "id", "github_commit", "sha", "filename", "status", "additions", "deletions", "changes",
+    "blob_url", "raw_url", "contents_url",
+]
+
+
+class ExpandMixin:
+    """
+    Reads `?expand=` into the serializer context so that nested relations are only
+    serialized, and prefetched, when asked for.
+    """
+
+    def get_expand(self):
+        request = getattr(self, "request", None)
+        if request is None:
+            return set()
+        return {name.strip() for name in request.query_params.get("expand", "").split(",") if name.strip()}
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "expand": self.get_expand()}
+
+
+def file_changes_prefetch(lookup):
+    return Prefetch(
+        lookup,
+        queryset=GithubFileChange.objects.only(*FILE_CHANGE_PREFETCH_FIELDS).order_by("filename"),
+    )
+
+
+@extend_schema_view(
+    list=extend_schema(parameters=[EXPAND_PARAMETER]),
+    retrieve=extend_schema(parameters=[EXPAND_PARAMETER]),
+)
+class GitHubEventViewSet(ExpandMixin, viewsets.ReadOnlyModelViewSet):
     """
-    ViewSet for listing or retrieving GitHub events.
+    ViewSet for listing or retrieving the current user's GitHub events.
     """
     queryset = GitHubEvent.objects.all()
     serializer_class = GitHubEventSerializer
+    pagination_class = KeysetPagination
+    filterset_class = GitHubEventFilter
+    ordering = ('-date', '-id')
+
+    def get_queryset(self):
+        # A page is served by three queries at most: events, their commits and their file changes
+        prefetches = [
+            Prefetch(
+                "githubcommit_set",
+                queryset=GitHubCommit.objects.only(*COMMIT_PREFETCH_FIELDS).order_by("date", "oid"),
+            ),
+        ]
+        if "files" in self.get_expand():
+            prefetches.append(file_changes_prefetch("githubcommit_set__githubfilechange_set"))
+        return super().get_queryset().filter(user=self.request.user).prefetch_related(*prefetches)
 
 
-class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
+@extend_schema_view(
+    list=extend_schema(parameters=[EXPAND_PARAMETER]),
+    retrieve=extend_schema(parameters=[EXPAND_PARAMETER]),
+)
+class GitHubCommitViewSet(ExpandMixin, viewsets.ReadOnlyModelViewSet):
     """
-    ViewSet for listing or retrieving GitHub commits.
+    ViewSet for listing or retrieving the current user's GitHub commits.
     """
     queryset = GitHubCommit.objects.all()
     serializer_class = GitHubCommitSerializer
+    pagination_class = KeysetPagination
+    filterset_class = GitHubCommitFilter
+    ordering = ('-date', '-oid')
+
+    def get_queryset(self):
+        queryset = super().get_queryset().filter(user=self.request.user)
+        if "files" in self.get_expand():
+            queryset = queryset.prefetch_related(file_changes_prefetch("githubfilechange_set"))
+        if self.action == 'list':
+            # Undated commits have no place in the keyset ordering
+            queryset = queryset.filter(date__isnull=False)
+        return queryset
 
     @extend_schema(
         summary="Get commits and changes by day",
         description=(
             "Retrieve the total number of commits and changes grouped by day "
-            "within the specified date range. Defaults to the last 30 days if no dates are provided."
+            "within the specified date range. Defaults to the last 30 days if no dates are provided. "
+            "The crawl runs in the background: the response is a 202 with a job to poll at `status_url`. "
+            "With `sync=true` and a range of at most GITHUB_SYNC_MAX_WINDOW_DAYS days, the commits are "
+            "returned directly instead."
         ),
         parameters=[
             OpenApiParameter(
@@ -52,8 +136,15 @@ class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
                 type=str,
                 location=OpenApiParameter.QUERY,
             ),
+            OpenApiParameter(
+                name="sync",
+                description="Crawl inside the request and return the commits (small ranges only).",
+                required=False,
+                type=bool,
+                location=OpenApiParameter.QUERY,
+            ),
         ],
-        responses={200: None},  # Replace `None` with your response serializer if needed
+        responses={200: None, 202: None},  # Replace `None` with your response serializer if needed
     )
     @action(detail=False, methods=["get"], url_path="commits-with-changes")
     def commits_with_changes(self, request):
@@ -62,6 +153,7 @@ class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
         Query parameters:
         - `start_date`: Optional start date for the range (defaults to 30 days ago if not provided).
         - `end_date`: Optional end date for the range (defaults to today if not provided).
+        - `sync`: Crawl inside the request instead of starting a background job.
         """
         user = request.user
         
@@ -81,50 +173,103 @@ class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
         except ValueError:
             return Response({"error": "Invalid date format. Please use ISO 8601 format (e.g., '2024-01-01')."}, status=400)
 
-        # Fetch commits with changes using the utility function
+        if request.query_params.get("sync", "").lower() not in ("true", "1"):
+            job = GitHubSyncJob.objects.create(user=user, start_date=start_date, end_date=end_date)
+            crawl_commits_with_changes.delay(str(job.id))
+            return Response(
+                {
+                    "job_id": str(job.id),
+                    "status": job.status,
+                    "status_url": reverse(
+                        "commit-commits-with-changes-job", kwargs={"job_id": str(job.id)}, request=request
+                    ),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        max_days = settings.GITHUB_SYNC_MAX_WINDOW_DAYS
+        if (end_date - start_date).days + 1 > max_days:
+            return Response(
+                {"error": f"Synchronous mode is limited to {max_days} days, drop `sync=true` to start a job."},
+                status=400,
+            )
+
+        # Fetch the commits not synced yet using the utility function
+        crawl_started_at = now()
         commit_data = fetch_commits_with_changes(user, start_date, end_date)
 
         if "error" in commit_data:
             return Response({"error": commit_data["error"]}, status=400)
 
-        update_github_commits.delay(user.id, commit_data)
-        return Response(commit_data)
+        update_github_commits.delay(user.id, commit_data, **get_sync_window(start_date, end_date, crawl_started_at))
+        return Response(include_stored_commits(user, commit_data))
+
+    @extend_schema(
+        summary="Get a commits-with-changes job",
+        description=(
+            "Poll a background commits-with-changes crawl. Returns its status and progress, "
+            "and the commits grouped by day once it succeeded."
+        ),
+        responses={200: None},
+    )
+    @action(detail=False, methods=["get"], url_path=r"commits-with-changes/jobs/(?P<job_id>[0-9a-f-]+)")
+    def commits_with_changes_job(self, request, job_id=None):
+        """
+        Endpoint to poll a job started by `commits-with-changes`.
+        """
+        job = get_object_or_404(GitHubSyncJob, id=job_id, user=request.user)
+
+        progress = {
+            "repositories_crawled": job.repositories_crawled,
+            "commits_found": job.commits_found,
+        }
+        if job.status in ("pending", "running"):
+            progress = cache.get(job.progress_key) or progress
+
+        data = {
+            "job_id": str(job.id),
+            "status": job.status,
+            "start_date": job.start_date.isoformat(),
+            "end_date": job.end_date.isoformat(),
+            "progress": progress,
+            "error": job.error or None,
+        }
+        if job.status == "succeeded":
+            data["result"] = include_stored_commits(
+                request.user,
+                initialize_commit_details(job.start_date.isoformat(), job.end_date.isoformat()),
+            )
+        return Response(data)
 
     @action(detail=False, methods=["get"], url_path="activity-streak")
     def activity_streak(self, request):
-        def get_current_day():
-            today = now()
-            first_day = timezone.make_aware(datetime(2024, 1, 1), timezone.get_current_timezone())
-            return (today - first_day).days + 1
         """
-        Endpoint to retrieve the current and longest streak of coding activity.
+        Endpoint to retrieve the current and longest streak of coding activity, computed from
+        the stored daily activity so that streaks can span several years.
         Query parameters:
-          - `year`: The year for which to fetch the contribution calendar (optional).
+          - `daily_goal`: Commits a day needs to count towards a streak (integer, default: 1).
+          - `year`: Restricts the streaks to one calendar year (optional).
+          - `start_date`, `end_date`: Restrict the streaks to a range (YYYY-MM-DD, optional).
         """
         user = request.user
-        daily_goal = 1
-        year = request.query_params.get("year", None)
-
-        # Validate the year parameter (if provided)
-        if year:
-            try:
+        try:
+            daily_goal = int(request.query_params.get("daily_goal", 1))
+            start_date = request.query_params.get("start_date")
+            end_date = request.query_params.get("end_date")
+            start_date = date.fromisoformat(start_date) if start_date else None
+            end_date = date.fromisoformat(end_date) if end_date else None
+            year = request.query_params.get("year")
+            if year:
                 year = int(year)
-            except ValueError:
-                return Response({"error": "Invalid year format."}, status=400)
-        else:
-            # If no year is provided, use the current year
-            year = now().year
-        today_th = None
-        if year == now().year:
-            today_th = get_current_day()
-
-        # Fetch the contribution data from GitHub for the specified year
-        contribution_data = fetch_contribution_calendar(user, year)
-        if "error" in contribution_data:
-            return Response({"error": contribution_data["error"]}, status=400)
+                start_date, end_date = date(year, 1, 1), date(year, 12, 31)
+        except ValueError:
+            return Response({"error": "Invalid year, date or daily goal format."}, status=400)
+        if daily_goal < 1:
+            return Response({"error": "daily_goal must be at least 1."}, status=400)
+        if start_date and end_date and start_date > end_date:
+            return Response({"error": "start_date must be before end_date."}, status=400)
 
-        # Calculate the activity streak
-        streak_data = calculate_activity_streak(contribution_data["data"]["user"]["contributionsCollection"]["contributionCalendar"], daily_goal, today_th)
+        streak_data = get_activity_streaks(user.id, daily_goal, start_date, end_date)
         return Response(streak_data)
 
     @action(detail=False, methods=["get"], url_path="daily-goal-progress")
@@ -149,15 +294,13 @@ class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
             # If no year is provided, use the current year
             year = now().year
 
-        # Fetch the contribution data from GitHub for the specified year
-        contribution_data = fetch_contribution_calendar(user, year)
-        if "error" in contribution_data:
-            return Response({"error": contribution_data["error"]}, status=400)
+        # Read the stored contribution calendar for the specified year
+        contribution_calendar = get_contribution_calendar(user, year)
+        if "error" in contribution_calendar:
+            return Response({"error": contribution_calendar["error"]}, status=400)
 
         # Calculate the daily goal progress
-        progress_data = calculate_daily_goal_progress(
-            contribution_data["data"]["user"]["contributionsCollection"]["contributionCalendar"], daily_goal
-        )
+        progress_data = calculate_daily_goal_progress(contribution_calendar, daily_goal)
         return Response(progress_data)
 
     @extend_schema(
@@ -197,24 +340,28 @@ class GitHubCommitViewSet(viewsets.ReadOnlyModelViewSet):
             # If no year is provided, return the current year
             year = now().year
 
-        # Fetch the contribution data from GitHub
-        contribution_data = fetch_contribution_calendar(user, year)
-        if "error" in contribution_data:
-            return Response({"error": contribution_data["error"]}, status=400)
-        
-        # update_user_challenges.delay(
-        #     user.id, 
-        #     contribution_data
-        # )
-        return Response(contribution_data)
+        # Read the stored contribution calendar, GitHub is only asked when it was never fetched
+        contribution_calendar = get_contribution_calendar(user, year)
+        if "error" in contribution_calendar:
+            return Response({"error": contribution_calendar["error"]}, status=400)
+
+        # Same shape as the GitHub GraphQL response
+        return Response({"data": {"user": {"contributionsCollection": {"contributionCalendar": contribution_calendar}}}})
 
 
 class GithubFileChangeViewSet(viewsets.ReadOnlyModelViewSet):
     """
-    ViewSet for listing or retrieving GitHub file changes.
+    ViewSet for listing or retrieving the file changes of the current user's GitHub commits.
     """
     queryset = GithubFileChange.objects.all()
     serializer_class = GithubFileChangeSerializer
+    pagination_class = KeysetPagination
+    filterset_class = GithubFileChangeFilter
+    # Follows the commit FK index, then the file changes of each commit
+    ordering = ('-github_commit_id', '-id')
+
+    def get_queryset(self):
+        return super().get_queryset().filter(github_commit__user=self.request.user)
 
 
 @api_view(["GET"])
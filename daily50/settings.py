@@ -162,6 +162,55 @@ LOGOUT_REDIRECT_URL = '/'
 # GitHub OAuth settings
 GITHUB_CALLBACK = env('GITHUB_CALLBACK', default='http://localhost:3000/auth/github/callback/')
 
+# Maximum number of concurrent GitHub API requests issued per token while crawling commits
+GITHUB_CRAWL_CONCURRENCY = env.int('GITHUB_CRAWL_CONCURRENCY', default=8)
+
+# Incremental syncs re-request commits this many minutes before the last sync to catch late pushes
+GITHUB_SYNC_OVERLAP_MINUTES = env.int('GITHUB_SYNC_OVERLAP_MINUTES', default=60)
+
+# Seconds a revalidatable GitHub REST response (body + ETag) is kept in the cache
+GITHUB_HTTP_CACHE_TIMEOUT = env.int('GITHUB_HTTP_CACHE_TIMEOUT', default=24 * 60 * 60)
+# Seconds an immutable GitHub REST payload (e.g. commit details by SHA) is kept in the cache
+GITHUB_HTTP_IMMUTABLE_CACHE_TIMEOUT = env.int('GITHUB_HTTP_IMMUTABLE_CACHE_TIMEOUT', default=7 * 24 * 60 * 60)
+
+# Seconds the current year's contribution calendar is served before it is refreshed in the background
+GITHUB_CALENDAR_TTL = env.int('GITHUB_CALENDAR_TTL', default=5 * 60)
+
+# Requests (REST) or points (GraphQL) of each token's rate limit that background syncs leave to interactive requests
+GITHUB_RATE_LIMIT_BACKGROUND_RESERVE = env.int('GITHUB_RATE_LIMIT_BACKGROUND_RESERVE', default=1000)
+
+# Commits resolved per aliased GraphQL request, keeps each query well below the node limit
+GITHUB_GRAPHQL_BATCH_SIZE = env.int('GITHUB_GRAPHQL_BATCH_SIZE', default=50)
+# Whether syncs fetch per-file changes, which cost one REST call per new commit
+GITHUB_SYNC_FILE_CHANGES = env.bool('GITHUB_SYNC_FILE_CHANGES', default=True)
+
+# Widest date range commits-with-changes still crawls inside the request with `?sync=true`
+GITHUB_SYNC_MAX_WINDOW_DAYS = env.int('GITHUB_SYNC_MAX_WINDOW_DAYS', default=31)
+
+# Periodic sync: users are split into GITHUB_SYNC_SHARDS shards by id and one shard is scheduled
+# per beat tick, so every shard comes up once per GITHUB_SYNC_ACTIVE_INTERVAL_MINUTES. Users who
+# logged in within GITHUB_SYNC_ACTIVE_DAYS are synced on every pass, the others once their last
+# sync is older than GITHUB_SYNC_INACTIVE_INTERVAL_MINUTES.
+GITHUB_SYNC_SHARDS = env.int('GITHUB_SYNC_SHARDS', default=12)
+GITHUB_SYNC_ACTIVE_INTERVAL_MINUTES = env.int('GITHUB_SYNC_ACTIVE_INTERVAL_MINUTES', default=60)
+GITHUB_SYNC_INACTIVE_INTERVAL_MINUTES = env.int('GITHUB_SYNC_INACTIVE_INTERVAL_MINUTES', default=24 * 60)
+GITHUB_SYNC_ACTIVE_DAYS = env.int('GITHUB_SYNC_ACTIVE_DAYS', default=7)
+# Users per fanned-out sync task and days of history a periodic sync covers
+GITHUB_SYNC_BATCH_SIZE = env.int('GITHUB_SYNC_BATCH_SIZE', default=25)
+GITHUB_SYNC_WINDOW_DAYS = env.int('GITHUB_SYNC_WINDOW_DAYS', default=30)
+
+# Rows per bulk upsert statement when ingesting commits and file changes
+GITHUB_INGEST_CHUNK_SIZE = env.int('GITHUB_INGEST_CHUNK_SIZE', default=1000)
+
+# Shared keep-alive HTTP session used for all GitHub traffic
+GITHUB_HTTP_POOL_SIZE = env.int('GITHUB_HTTP_POOL_SIZE', default=20)
+GITHUB_HTTP_CONNECT_TIMEOUT = env.float('GITHUB_HTTP_CONNECT_TIMEOUT', default=3.05)
+GITHUB_HTTP_READ_TIMEOUT = env.float('GITHUB_HTTP_READ_TIMEOUT', default=30.0)
+GITHUB_HTTP_MAX_RETRIES = env.int('GITHUB_HTTP_MAX_RETRIES', default=3)
+GITHUB_HTTP_MAX_BACKOFF = env.int('GITHUB_HTTP_MAX_BACKOFF', default=10)
+# Multiplex requests over HTTP/2, requires `pip install httpx[http2]`
+GITHUB_HTTP2 = env.bool('GITHUB_HTTP2', default=False)
+
 SOCIALACCOUNT_STORE_TOKENS = True
 SOCIALACCOUNT_PROVIDERS = {
     'github': {
@@ -259,6 +308,20 @@ CACHES = {
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
 
+# Challenge progress history: days returned by default and at most by `progress_detail`, and
+# days kept at daily resolution before snapshots are downsampled to one per week
+PROGRESS_DETAIL_DEFAULT_DAYS = env.int('PROGRESS_DETAIL_DEFAULT_DAYS', default=30)
+PROGRESS_DETAIL_MAX_DAYS = env.int('PROGRESS_DETAIL_MAX_DAYS', default=366)
+PROGRESS_SNAPSHOT_DAILY_DAYS = env.int('PROGRESS_SNAPSHOT_DAILY_DAYS', default=90)
+
+# Challenge syncs of a user are coalesced: one starts this many seconds after the first request
+# and covers all requests made meanwhile. The lock bounds how long a sync can block the next one.
+CHALLENGE_SYNC_DEBOUNCE_SECONDS = env.int('CHALLENGE_SYNC_DEBOUNCE_SECONDS', default=30)
+CHALLENGE_SYNC_LOCK_SECONDS = env.int('CHALLENGE_SYNC_LOCK_SECONDS', default=10 * 60)
+
+# Seconds an activity streak result is cached, ingesting commits invalidates it earlier
+ACTIVITY_STREAK_CACHE_TIMEOUT = env.int('ACTIVITY_STREAK_CACHE_TIMEOUT', default=24 * 60 * 60)
+
 # Celery configuration
 CELERY_BROKER_URL = env('REDIS_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = env('REDIS_URL', default='redis://localhost:6379/0')
@@ -270,6 +333,16 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
+CELERY_BEAT_SCHEDULE = {
+    'schedule-github-syncs': {
+        'task': 'core.tasks.sync_scheduler.schedule_github_syncs',
+        'schedule': GITHUB_SYNC_ACTIVE_INTERVAL_MINUTES * 60 / GITHUB_SYNC_SHARDS,
+    },
+    'downsample-progress-snapshots': {
+        'task': 'core.tasks.sync_challenges.downsample_progress_snapshots',
+        'schedule': 24 * 60 * 60,
+    },
+}
 
 # Security settings for production
 if not DEBUG: